@@ -0,0 +1,287 @@
+# benchmarks/load_test.py
+"""
+Concurrent-session load test for the Streamlit pages.
+
+Drives the real page scripts headlessly with streamlit.testing.v1.AppTest.
+Each simulated session:
+  1. logs in on 1_Login.py
+  2. picks the district and constituency on 0_Home.py
+  3. unlocks the constituency on 2_Booth_Analysis.py
+  4. analyses --booths-per-session random booths (search, select, Analyze)
+
+Each session runs in its own process with its own AppTest (AppTest is not
+thread-safe: every run swaps process-wide runtime and config state, so
+sessions sharing a process would have to take turns). The N sessions start
+together behind a barrier and really run at once, contending for CPU, disk
+and memory. Unlike sessions on one Streamlit server they don't share the GIL
+or the module-level caches: each process loads the constituency before the
+barrier, so runs are timed against warm caches, as on a server that has
+served the constituency once.
+
+    BOOTH_LOADTEST_USER=... BOOTH_LOADTEST_PASSWORD=... \\
+        python -m benchmarks.load_test --sessions 20 --booths-per-session 5
+
+Reports per-step latency percentiles, throughput (reruns/s) and peak RSS
+(largest session process, and the sum over all of them).
+st.switch_page cannot navigate outside a multipage app run, so the harness
+carries session_state from page to page itself and ignores that error.
+"""
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PAGES = os.path.join(ROOT, "pages")
+PASSWORDS_FILE = os.path.join(ROOT, "data", "passwords.json")
+NAVIGATION_ERRORS = ("Could not find page",)
+
+sys.path.insert(0, ROOT)
+from utils.analytics import load_dataset  # noqa: E402
+
+# imported by the pages; loaded before the start barrier like the data, so
+# first runs aren't timed against a cold import
+WARM_MODULES = ("plotly.graph_objects", "utils.anomalies", "utils.export", "utils.figures",
+                "utils.leaderboard", "utils.watcher")
+
+
+def _quiet_streamlit():
+    """Silence bare-mode warnings and the expected switch_page tracebacks."""
+    # streamlit re-applies logger.level whenever it (re)parses its config
+    os.environ["STREAMLIT_LOGGER_LEVEL"] = "critical"
+    set_log_level(logging.CRITICAL)
+
+
+def _rss_kb():
+    """Current resident set size in KB (Linux /proc), else the peak so far."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_kb = _rss_kb()
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            self.peak_kb = max(self.peak_kb, _rss_kb())
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+        self.peak_kb = max(self.peak_kb, _rss_kb())
+
+
+class Session:
+    def __init__(self, n, args):
+        self.n = n
+        self.args = args
+        self.timings = []  # (step, ms, ok)
+        self.state = {}
+
+    def _run(self, step, at, action=None):
+        started = time.perf_counter()
+        (action or at.run)()
+        ms = (time.perf_counter() - started) * 1000
+        errors = [e.value for e in at.exception if not str(e.value).startswith(NAVIGATION_ERRORS)]
+        self.timings.append((step, ms, not errors))
+        if errors:
+            raise RuntimeError(f"session {self.n} {step}: {errors[0]}")
+        return at
+
+    def _page(self, name):
+        at = AppTest.from_file(os.path.join(PAGES, name), default_timeout=self.args.timeout)
+        for k, v in self.state.items():
+            at.session_state[k] = v
+        return at
+
+    def _keep(self, at, *keys):
+        for k in keys:
+            if k in at.session_state:
+                self.state[k] = at.session_state[k]
+
+    def login(self):
+        at = self._page("1_Login.py")
+        self._run("login_open", at)
+        at.text_input[0].input(self.args.user)
+        at.text_input[1].input(self.args.password)
+        self._run("login_submit", at, at.button[0].click().run)
+        if "logged_in" not in at.session_state or not at.session_state["logged_in"]:
+            raise RuntimeError(f"session {self.n}: login failed")
+        self._keep(at, "logged_in", "user")
+
+    def home(self):
+        at = self._page("0_Home.py")
+        self._run("home_open", at)
+        self._run("home_district", at, at.selectbox[0].select(self.args.district).run)
+        self._run("home_constituency", at, at.selectbox[1].select(self.args.constituency).run)
+        self.state.update(district=self.args.district, constituency=self.args.constituency)
+
+    def booth_analysis(self, booths, rng):
+        at = self._page("2_Booth_Analysis.py")
+        self._run("booth_open", at)
+        if at.text_input and at.text_input[0].label.startswith("Enter Constituency Password"):
+            at.text_input[0].input(self.args.constituency_password)
+            unlock = next(b for b in at.button if "Unlock" in b.label)
+            self._run("unlock", at, unlock.click().run)
+        for booth in rng.sample(booths, min(self.args.booths_per_session, len(booths))):
+            self._run("booth_search", at, at.text_input(key="booth_query").input(booth).run)
+            self._run("booth_select", at, at.selectbox[0].select(booth).run)
+            analyze = next(b for b in at.button if b.label.startswith("Analyze Booth"))
+            self._run("booth_analyze", at, analyze.click().run)
+
+    def run(self, booths):
+        rng = random.Random(self.n)
+        try:
+            self.login()
+            self.home()
+            self.booth_analysis(booths, rng)
+            return None
+        except Exception as e:
+            return str(e)
+
+
+def _session_process(n, args, barrier, results):
+    """One session in its own process: warm the caches, wait for the others, run."""
+    _quiet_streamlit()
+    error, session = None, Session(n, args)
+    sampler = RssSampler()
+    sampler.start()
+    try:
+        for module in WARM_MODULES:
+            importlib.import_module(module)
+        booths = load_dataset(args.district, args.constituency)["booth_index"].booths
+    except Exception as e:
+        booths, error = [], f"session {n}: {e}"
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        error = error or f"session {n}: start barrier broken"
+    if error is None:
+        error = session.run(booths)
+    sampler.stop()
+    results.put((n, session.timings, error, sampler.peak_kb))
+
+
+def percentiles(ms):
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"count": len(ms), "mean_ms": statistics.fmean(ms), "p50_ms": p50, "p95_ms": p95,
+            "p99_ms": p99, "max_ms": max(ms)}
+
+
+def run(args):
+    _quiet_streamlit()  # the environment variable is inherited by the session processes
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(args.sessions + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_session_process, args=(i, args, barrier, results), daemon=True)
+             for i in range(args.sessions)]
+    for p in procs:
+        p.start()
+    try:
+        barrier.wait(timeout=args.timeout)  # every session has loaded the constituency
+    except threading.BrokenBarrierError:
+        pass  # some session never got ready: run the rest, it is reported below
+    started = time.perf_counter()
+    done = []
+    while len(done) < len(procs):
+        try:
+            done.append(results.get(timeout=args.timeout))
+        except queue.Empty:
+            break
+    wall = time.perf_counter() - started
+    for p in procs:
+        p.join(timeout=5)
+        if p.is_alive():
+            p.terminate()
+
+    timings = [t for _, ts, _, _ in done for t in ts]
+    errors = [e for _, _, e, _ in done if e]
+    errors += [f"session {i}: no result (crashed or timed out)"
+               for i in sorted(set(range(args.sessions)) - {n for n, *_ in done})]
+    peaks = [kb for *_, kb in done]
+    steps = {}
+    for step, ms, _ in timings:
+        steps.setdefault(step, []).append(ms)
+    latency = [ms for _, ms, _ in timings]
+    return {
+        "sessions": args.sessions,
+        "booths_per_session": args.booths_per_session,
+        "constituency": f"{args.district}/{args.constituency}",
+        "wall_s": round(wall, 3),
+        "reruns": len(timings),
+        "throughput_reruns_per_s": round(len(timings) / wall, 2) if wall else 0.0,
+        "failed_sessions": len(errors),
+        "errors": errors[:10],
+        "cpus": os.cpu_count(),
+        "rss_peak_mb": round(max(peaks, default=0) / 1024, 1),
+        "rss_peak_total_mb": round(sum(peaks) / 1024, 1),
+        "all": {k: round(v, 2) for k, v in percentiles(latency).items()} if timings else {},
+        "steps": {s: {k: round(v, 2) for k, v in percentiles(ms).items()} for s, ms in steps.items()},
+    }
+
+
+def _print_report(r):
+    print(f"{r['sessions']} sessions × {r['booths_per_session']} booths on {r['constituency']}: "
+          f"{r['reruns']} reruns in {r['wall_s']:.1f}s → {r['throughput_reruns_per_s']:.1f} reruns/s, "
+          f"{r['failed_sessions']} failed sessions")
+    print(f"one process per session on {r['cpus']} CPUs (no shared GIL or caches); "
+          f"peak RSS {r['rss_peak_mb']:.0f} MB per session, {r['rss_peak_total_mb']:.0f} MB summed")
+    print(f"{'step':<18} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for step, s in list(r["steps"].items()) + [("ALL", r["all"])]:
+        if s:
+            print(f"{step:<18} {s['count']:>6} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+    for e in r["errors"]:
+        print(f"  ❌ {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load-test the Streamlit pages with concurrent headless sessions, one process each.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--booths-per-session", type=int, default=3)
+    parser.add_argument("--district", default="Ariyalur")
+    parser.add_argument("--constituency", default="Jayankondam")
+    parser.add_argument("--user", default=os.environ.get("BOOTH_LOADTEST_USER"))
+    parser.add_argument("--password", default=os.environ.get("BOOTH_LOADTEST_PASSWORD"))
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per script run")
+    parser.add_argument("--json", default=None, help="also write the report as JSON here")
+    args = parser.parse_args(argv)
+    if not args.user or not args.password:
+        parser.error("login credentials required: --user/--password or BOOTH_LOADTEST_USER/BOOTH_LOADTEST_PASSWORD")
+    with open(PASSWORDS_FILE) as f:
+        args.constituency_password = json.load(f).get(args.district, {}).get(args.constituency, "")
+
+    report = run(args)
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["failed_sessions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
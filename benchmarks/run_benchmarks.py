@@ -0,0 +1,155 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarks for the loading and analysis hot paths, on synthetic Form-20 data.
+
+    python -m benchmarks.run_benchmarks                      # compare with baselines.json
+    python -m benchmarks.run_benchmarks --booths 100 5000 --save
+
+Cases (per booth count, all three layouts per constituency):
+  parse          – load_clean_csv on every file (no cache)
+  parse_cached   – load_clean_csv_cached on a warm parse cache
+  booth_table    – build_booth_table for the constituency
+  booth_lookup   – per-booth aggregation for one booth (rows + trend)
+  booth_index    – BoothIndex build for the constituency (also yields the
+                   numeric-ordered booth list the pages use)
+  booth_search   – one number-prefix plus one station-text query on the index
+  anomaly_scan   – scan_anomalies over every booth and year
+  crosswalk      – BoothCrosswalk build plus aligning the booth table
+  figures        – pie + multi-year figures for one booth, built from scratch
+  figures_cached – the same figures from a warm FigureCache
+  multiples      – one small-multiples figure for 24 booths
+
+Timings are the median of --repeat runs in milliseconds. --save writes them to
+baselines.json; without it, results are printed next to the saved baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import write_constituency
+from utils.analytics import booth_report
+from utils.anomalies import scan_anomalies
+from utils.booth_index import BoothIndex
+from utils.crosswalk import BoothCrosswalk
+from utils.figures import FigureCache, build_pie, build_small_multiples, build_trend
+from utils.booth_table import booth_rows, booth_trend, build_booth_table
+from utils.form20 import load_clean_csv
+from utils.parse_cache import load_clean_csv_cached
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_BOOTHS = [100, 1000, 5000]
+
+
+def _median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    return statistics.median(times)
+
+
+def run_case(root, booths, candidates, malformed_rate, repeat):
+    files = write_constituency(root, "Bench", f"B{booths}", booths=booths, candidates=candidates,
+                               malformed_rate=malformed_rate, seed=booths)
+    folder = os.path.join(root, "Bench", f"B{booths}")
+    paths = [(year, os.path.join(folder, name)) for year, name in files]
+    cache_dir = os.path.join(root, "cache")
+
+    def load_all(loader, **kw):
+        out = {}
+        for year, path in paths:
+            df, cands, pcol = loader(path, **kw)
+            out[year] = {"data": df, "candidates": cands, "polling_col": pcol}
+        return out
+
+    results = {"parse": _median_ms(lambda: load_all(load_clean_csv), repeat)}
+    load_all(load_clean_csv_cached, cache_dir=cache_dir)  # warm
+    results["parse_cached"] = _median_ms(lambda: load_all(load_clean_csv_cached, cache_dir=cache_dir), repeat)
+
+    all_data = load_all(load_clean_csv)
+    results["booth_table"] = _median_ms(lambda: build_booth_table(all_data), repeat)
+    table = build_booth_table(all_data)
+    booth = str(booths // 2)
+    results["booth_lookup"] = _median_ms(lambda: booth_trend(booth_rows(table, booth)), repeat)
+    results["booth_index"] = _median_ms(lambda: BoothIndex.from_all_data(all_data), repeat)
+    index = BoothIndex.from_all_data(all_data)
+    results["booth_search"] = _median_ms(lambda: (index.search(booth[:2]), index.search("(a)")), repeat)
+    years = sorted(all_data, key=int)
+    results["anomaly_scan"] = _median_ms(lambda: scan_anomalies(table, years), repeat)
+    results["crosswalk"] = _median_ms(lambda: BoothCrosswalk.from_all_data(all_data).align(table), repeat)
+
+    report = booth_report({"booth_table": table, "years": years}, booth)
+    results["figures"] = _median_ms(
+        lambda: [build_pie(booth, r) for r in report.years] + [build_trend(booth, report.trend)], repeat)
+    figures = FigureCache()
+
+    def cached_figures():
+        for r in report.years:
+            figures.get_or_build(("pie", r.year), lambda: build_pie(booth, r))
+        figures.get_or_build(("trend",), lambda: build_trend(booth, report.trend))
+
+    cached_figures()  # warm
+    results["figures_cached"] = _median_ms(cached_figures, repeat)
+    many = [str(b) for b in range(1, min(booths, 24) + 1)]
+    results["multiples"] = _median_ms(lambda: build_small_multiples(table, many, years), repeat)
+    return {k: round(v, 3) for k, v in results.items()}
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Form-20 loading and booth analysis.")
+    parser.add_argument("--booths", type=int, nargs="+", default=DEFAULT_BOOTHS)
+    parser.add_argument("--candidates", type=int, default=15)
+    parser.add_argument("--malformed-rate", type=float, default=0.01)
+    # medians of 5 runs moved by ±100% between identical runs on a busy machine
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--save", action="store_true", help=f"record results as the baseline ({BASELINE_PATH})")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        for n in args.booths:
+            results[str(n)] = run_case(root, n, args.candidates, args.malformed_rate, args.repeat)
+
+    print(f"{'booths':>7} {'case':<14} {'ms':>10} {'baseline':>10} {'change':>8}")
+    for n, cases in results.items():
+        for case, ms in cases.items():
+            base = baseline.get(n, {}).get(case)
+            change = f"{(ms / base - 1) * 100:+.0f}%" if base else ""
+            base_s = f"{base:.3f}" if base else "-"
+            print(f"{n:>7} {case:<14} {ms:>10.3f} {base_s:>10} {change:>8}")
+
+    if args.save:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({
+                "environment": environment(),
+                "settings": {"candidates": args.candidates, "malformed_rate": args.malformed_rate,
+                             "repeat": args.repeat},
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved baseline to {BASELINE_PATH}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# benchmarks/synthetic.py
+"""
+Synthetic Form-20 generator.
+
+Writes files in the three layouts seen in data/:
+  2019 – comma separated, candidate-name row above a party-code header,
+         then a zero spacer row (csv/party-header)
+  2021 – tab separated, candidate-name header followed by a PARTY row
+         (tsv/party-row)
+  2024 – comma separated, like 2021 but with a split preamble and a block of
+         trailing empty columns (csv/party-row)
+
+Every layout carries a "Polling Station Name" column: each place has one
+name in every year (a place name unique to it + a building). From 2021 on,
+renumber_rate of the booths swap numbers in pairs and rename_rate of them
+get a new name under the same number, so the crosswalk (utils/crosswalk.py)
+sees renumbered and renamed stations as well as auxiliary splits.
+
+    python -m benchmarks.synthetic --out /tmp/synth --booths 1000 --candidates 15
+"""
+import argparse
+import csv
+import os
+import random
+
+PARTIES = ["DMK", "AIADMK", "BJP", "PMK", "VCK", "NTK", "INC", "BSP", "AMMK", "IJK", "DMDK", "CPI(M)"]
+LAYOUTS = ["2019", "2021", "2024"]
+ELECTION = {"2019": "MP", "2021": "MLA", "2024": "MP"}
+# one word each: two places sharing a building then overlap far less than the
+# crosswalk's NAME_MATCH
+BUILDINGS = ["SCHOOL", "ANGANWADI", "OFFICE", "HALL", "LIBRARY"]
+_SYLLABLES = ["KA", "LA", "MA", "NA", "PA", "RA", "SA", "TA", "VA", "YA",
+              "KO", "LO", "MO", "NO", "PO", "RO", "SO", "TO", "VO", "YO"]
+
+
+def _candidates(n, rng):
+    """(name, party) pairs: the major parties first, independents after."""
+    n = max(n, 2)
+    parties = PARTIES[: min(n - 1, len(PARTIES))]
+    parties += ["IND"] * (n - 1 - len(parties))
+    out = [(f"CANDIDATE {i + 1}. {rng.choice('ABCDEFGHKMNPRS')}", p) for i, p in enumerate(parties)]
+    return out + [("NONE OF THE ABOVE", "NOTA")]
+
+
+def place_name(place, renamed=False):
+    """Station name of a place: a place name no other place has plus a building."""
+    digits, n = [], place
+    for _ in range(4):
+        n, d = divmod(n, len(_SYLLABLES))
+        digits.append(_SYLLABLES[d])
+    return f"{''.join(digits)}{'NAGAR' if renamed else 'PURAM'} {BUILDINGS[place % len(BUILDINGS)]}"
+
+
+def station_names(booths, renumber_rate=0.0, rename_rate=0.0, seed=0):
+    """
+    {booth number: station name} for a year after the changes: renumbered
+    booths swap numbers (and so names) in pairs, renamed ones keep their
+    number under a new name. The same booths change in every later year.
+    """
+    rng = random.Random(f"{seed}-renumber")
+    pairs = int(booths * renumber_rate / 2)
+    renamed = int(booths * rename_rate)
+    picked = rng.sample(range(1, booths + 1), min(pairs * 2 + renamed, booths))
+    place = {b: b for b in range(1, booths + 1)}
+    for a, b in zip(picked[:pairs * 2:2], picked[1:pairs * 2:2]):
+        place[a], place[b] = b, a
+    new_name = set(picked[pairs * 2:])
+    return {b: place_name(place[b], b in new_name) for b in place}
+
+
+def _station_labels(booths, aux_rate, rng, names):
+    """(label, station name) per station row."""
+    labels = []
+    for b in range(1, booths + 1):
+        name = names[b]
+        labels.append((str(b), name))
+        if rng.random() < aux_rate:
+            labels.append((f"{b}(A)", f"{name} ANNEXE"))
+    return labels
+
+
+def _vote_row(n_cands, rng):
+    electors = rng.randint(400, 1400)
+    polled = int(electors * rng.uniform(0.6, 0.9))
+    weights = [rng.paretovariate(1.2) for _ in range(n_cands)]
+    total_w = sum(weights)
+    votes = [int(polled * w / total_w) for w in weights]
+    votes[0] += polled - sum(votes)
+    return votes, polled
+
+
+def _malform(cells, rng):
+    """Corrupt one vote cell the way real sheets do."""
+    i = rng.randrange(2, len(cells))
+    kind = rng.choice(["blank", "comma", "space", "junk", "short"])
+    if kind == "blank":
+        cells[i] = ""
+    elif kind == "comma":
+        cells[i] = f"{int(cells[i] or 0):,}" if str(cells[i]).isdigit() else cells[i]
+    elif kind == "space":
+        cells[i] = f" {cells[i]} "
+    elif kind == "junk":
+        cells[i] = "-"
+    else:
+        del cells[i:]
+    return cells
+
+
+def generate_rows(layout, booths=300, candidates=15, malformed_rate=0.0, aux_rate=0.05, ac_no=999,
+                  ac_name="SYNTHETIC", seed=0, renumber_rate=0.02, rename_rate=0.01):
+    """All rows (lists of cells) of one synthetic Form-20 file."""
+    rng = random.Random(f"{seed}-{layout}")
+    changed = layout != LAYOUTS[0]
+    stations = station_names(booths, renumber_rate if changed else 0.0, rename_rate if changed else 0.0, seed)
+    cands = _candidates(candidates, rng)
+    names = [c[0] for c in cands]
+    parties = [c[1] for c in cands]
+    electors_total = 0
+    body = []
+    for sl, (station, name) in enumerate(_station_labels(booths, aux_rate, rng, stations), start=1):
+        votes, polled = _vote_row(len(cands), rng)
+        electors_total += polled
+        if layout == "2019":
+            cells = [str(sl), station, name] + [str(v) for v in votes] + [str(polled), str(polled), "0"]
+        else:
+            cells = [str(sl), station, name] + [str(v) for v in votes] + [str(polled), str(polled)]
+        if malformed_rate and rng.random() < malformed_rate:
+            cells = _malform(cells, rng)
+        body.append(cells)
+
+    if layout == "2019":
+        width = len(cands) + 6
+        pad = lambda r: r + [""] * (width - len(r))
+        head = [
+            pad(["Form_Title", "FORM 20 - FINAL RESULT SHEET -PART - I"]),
+            pad(["Election_Name", "GENERAL ELECTIONS TO LOK SABHA", ' 2019"']),
+            pad(["Constituency", f'{ac_no} - {ac_name.title()}"']),
+            pad(["Total_Electors", str(electors_total)]),
+            pad(["", "", ""] + names),
+            pad(["SL. NO.", "Polling Station No.", "Polling Station Name"] + parties
+                + ["TOTAL VOTES", "TOTAL TURNOVER"]),
+            pad(["0", "0", ""]),
+        ]
+        return head + [pad(r) if len(r) <= width else r[:width] for r in body]
+
+    if layout == "2021":
+        width = len(cands) + 5
+        pad = lambda r: r + [""] * (width - len(r))
+        head = [
+            pad(["GENERAL ELECTIONS TO TAMIL NADU LEGISLATIVE ASSEMBLY 2021"]),
+            pad([f"No. & Name of the Assembly Constituency: {ac_no} - {ac_name} AC"]),
+            pad([f"Total No. of Electors in Assembly Constituency: {electors_total}"]),
+            ["SL. NO.", "Polling Station No.", "Polling Station Name"] + names + ["TOTAL TURNOVER", "TOTAL VOTES"],
+            ["PARTY", "0", ""] + parties + ["0", "0"],
+        ]
+        return head + body
+
+    # 2024
+    width = len(cands) + 5 + 34
+    pad = lambda r: r + [""] * (width - len(r))
+    head = [
+        pad(["GENERAL ELECTIONS TO TAMIL NADU MP 2024"] + [""] * 8 + ["FORM 20 - FINAL RESULT SHEET -PART - I"]),
+        pad([f"No. & Name of the Assembly Constituency: {ac_no} - {ac_name} AC"] + [""] * 8
+            + ["GENERAL ELECTIONS TO LOK SABHA, 2024"]),
+        pad([f"Total No. of Electors in Assembly Constituency: {electors_total}"]),
+        pad(["SL. NO.", "Polling Station No.", "Polling Station Name"] + names),
+        pad(["PARTY", "0", ""] + parties + ["TOTAL TURNOVER", "TOTAL VOTES"]),
+    ]
+    return head + [pad(r) for r in body]
+
+
+def write_form20(path, layout, **kwargs):
+    rows = generate_rows(layout, **kwargs)
+    sep = "\t" if layout == "2021" else ","
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=sep, lineterminator="\n").writerows(rows)
+    return path
+
+
+def write_constituency(root, district="Synthetic", constituency="Synthetic", ac_no=999, layouts=LAYOUTS, **kwargs):
+    """Write one file per layout under root/<district>/<constituency>/. Returns [(year, filename)]."""
+    folder = os.path.join(root, district, constituency)
+    os.makedirs(folder, exist_ok=True)
+    files = []
+    for layout in layouts:
+        name = f"{layout}AC{ac_no}{ELECTION[layout]}.csv"
+        write_form20(os.path.join(folder, name), layout, ac_no=ac_no, ac_name=constituency.upper(), **kwargs)
+        files.append((layout, name))
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic Form-20 files.")
+    parser.add_argument("--out", required=True, help="data root to write <district>/<constituency>/ under")
+    parser.add_argument("--district", default="Synthetic")
+    parser.add_argument("--constituencies", type=int, default=1)
+    parser.add_argument("--booths", type=int, default=300)
+    parser.add_argument("--candidates", type=int, default=15)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--aux-rate", type=float, default=0.05)
+    parser.add_argument("--renumber-rate", type=float, default=0.02)
+    parser.add_argument("--rename-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for i in range(args.constituencies):
+        files = write_constituency(
+            args.out, args.district, f"AC{900 + i}", ac_no=900 + i, booths=args.booths,
+            candidates=args.candidates, malformed_rate=args.malformed_rate, aux_rate=args.aux_rate,
+            renumber_rate=args.renumber_rate, rename_rate=args.rename_rate, seed=args.seed + i,
+        )
+        print(f"{args.district}/AC{900 + i}: " + ", ".join(name for _, name in files))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,22 @@ import pandas as pd
 
 
 import os
+import sys
 
-st.write("📂 Current directory:", os.getcwd())
-
-pages_path = os.path.join(os.getcwd(), "pages")
-if os.path.exists(pages_path):
-    st.write("📄 Files Streamlit sees in /pages:", os.listdir(pages_path))
-else:
-    st.write("❌ pages folder not found")
+# make the repo-level utils package importable when Streamlit runs this page
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.manifest import constituencies as list_constituencies, districts as list_districts
+from utils.watcher import start_watcher
 
 
 # ---------------------------------------------------------------
 # Page Setup
 # ---------------------------------------------------------------
 st.set_page_config(page_title="Booth Dashboard – Select District", layout="wide")
+
+# pick up corrected Form-20 sheets without a restart (see utils/watcher.py)
+start_watcher()
+
 st.title("🗳️ Tamil Nadu Booth Dashboard")
 
 # 🚨 Access Control
@@ -28,20 +30,13 @@ if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
 
 
 # ---------------------------------------------------------------
-# District–Constituency Mapping
+# District–Constituency Mapping (discovered from data/, see utils/manifest.py)
 # ---------------------------------------------------------------
-district_data = pd.DataFrame([
-    ["Ariyalur", "Jayankondam", "2019AC150MP.csv", "2021AC150MLA.csv", "2024AC150MP.csv"],
-    ["Ariyalur", "Ariyalur", "2019AC149MP.csv", "2021AC149MLA.csv", "2024AC149MP.csv"],
-], columns=["District", "Constituency", "2019", "2021", "2024"])
-
-districts = sorted(district_data["District"].unique())
+districts = list_districts()
 district = st.selectbox("📍 Select District / மாவட்டம்", districts)
 
 if district:
-    constituencies = sorted(
-        district_data[district_data["District"] == district]["Constituency"].unique()
-    )
+    constituencies = list_constituencies(district)
     constituency = st.selectbox("🏛️ Select Constituency / தொகுதி", constituencies)
 else:
     constituency = None
@@ -53,8 +48,16 @@ if constituency:
     if st.button("➡ Go to Booth Analysis / பூத் பகுப்பாய்வு பக்கத்திற்கு செல்ல"):
         st.session_state["district"] = district
         st.session_state["constituency"] = constituency
-        st.session_state["district_data"] = district_data.to_dict()
         st.switch_page("2_Booth_Analysis")
+    if st.button("🔀 What-if Alliance Simulator"):
+        st.session_state["district"] = district
+        st.session_state["constituency"] = constituency
+        st.switch_page("5_Scenario_Simulator")
+
+if district:
+    if st.button("🗺️ District Rollup / மாவட்ட சுருக்கம்"):
+        st.session_state["district"] = district
+        st.switch_page("4_District_Rollup")
 
 # ---------------------------------------------------------------
 # Sidebar Logout
@@ -0,0 +1,106 @@
+# pages/4_District_Rollup.py
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+import os
+import sys
+
+# make the repo-level utils package importable when Streamlit runs this page
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.alliances import alliance_colors
+from utils.auth import constituency_passwords, is_unlocked
+from utils.manifest import constituencies as list_constituencies
+from utils.rollup import iter_district_rollup
+from utils.watcher import start_watcher
+
+# ---------------------------------------------------------------
+# Page setup
+# ---------------------------------------------------------------
+st.set_page_config(page_title="District Rollup", layout="wide")
+
+# pick up corrected Form-20 sheets without a restart (see utils/watcher.py)
+start_watcher()
+
+if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
+    st.warning("Please login to continue.")
+    st.link_button("🔐 Go to Login Page", "/1_Login")
+    st.stop()
+
+if "district" not in st.session_state:
+    st.error("⚠️ Please go back to the Dashboard page and select a District.")
+    st.stop()
+
+district = st.session_state["district"]
+st.title(f"🗺️ District Rollup – {district} District")
+
+# ---------------------------------------------------------------
+# Only constituencies that are open or already unlocked this session
+# ---------------------------------------------------------------
+passwords = constituency_passwords()
+
+names, locked = [], []
+for c in list_constituencies(district):
+    if is_unlocked(passwords, district, c):
+        names.append(c)
+    else:
+        locked.append(c)
+
+if locked:
+    st.info("🔒 Not included until unlocked on the Booth Analysis page: " + ", ".join(locked))
+if not names:
+    st.warning("No unlocked constituencies in this district.")
+    st.stop()
+
+# ---------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------
+def share_chart(share):
+    fig = go.Figure()
+    for alliance in share.columns:
+        fig.add_trace(go.Bar(
+            x=share.index, y=share[alliance].round(1), name=alliance,
+            marker_color=alliance_colors.get(alliance, "#95a5a6"),
+            text=share[alliance].round(1).astype(str) + "%", textposition="inside",
+        ))
+    fig.update_layout(barmode="stack", yaxis_title="Vote share %", xaxis_title="Year",
+                      height=420, margin=dict(t=30, b=30))
+    return fig
+
+
+def render(rollup, slots):
+    slots["share"].plotly_chart(share_chart(rollup.alliance_share), use_container_width=True)
+    slots["swing"].dataframe(rollup.swing.round(2), use_container_width=True)
+    slots["strength"].dataframe(rollup.strength_counts, use_container_width=True)
+    slots["summary"].dataframe(rollup.summary, use_container_width=True, hide_index=True)
+
+
+progress = st.progress(0.0, text=f"Loading {len(names)} constituencies…")
+st.subheader("📊 Alliance vote share by year")
+slots = {"share": st.empty()}
+st.subheader("↕️ Swing vs previous election (percentage points)")
+slots["swing"] = st.empty()
+st.subheader("🏷️ Booth strength counts")
+slots["strength"] = st.empty()
+st.subheader("🏛️ Constituencies")
+slots["summary"] = st.empty()
+
+errors = []
+for done, total, rollup, error in iter_district_rollup(district, names):
+    if error:
+        errors.append(error)
+    if rollup.constituencies:
+        render(rollup, slots)
+    progress.progress(done / total, text=f"Loaded {done} of {total} constituencies")
+progress.empty()
+
+for c, msg in errors:
+    st.warning(f"⚠️ {c}: {msg}")
+
+# ---------------------------------------------------------------
+# Sidebar Logout
+# ---------------------------------------------------------------
+with st.sidebar:
+    st.markdown("---")
+    if st.button("Logout"):
+        st.switch_page("3_Logout")
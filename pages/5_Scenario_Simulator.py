@@ -0,0 +1,140 @@
+# pages/5_Scenario_Simulator.py
+import streamlit as st
+import pandas as pd
+
+import os
+import sys
+
+# make the repo-level utils package importable when Streamlit runs this page
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.analytics import load_dataset
+from utils.auth import constituency_passwords, is_unlocked
+from utils.leaderboard import STRENGTH_LEVELS, WEAK_LABEL
+from utils.scenario import Scenario, compare, party_votes, simulate
+from utils.watcher import start_watcher
+
+# ---------------------------------------------------------------
+# Page setup
+# ---------------------------------------------------------------
+st.set_page_config(page_title="What-if Simulator", layout="wide")
+
+# pick up corrected Form-20 sheets without a restart (see utils/watcher.py)
+start_watcher()
+
+if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
+    st.warning("Please login to continue.")
+    st.link_button("🔐 Go to Login Page", "/1_Login")
+    st.stop()
+
+if "district" not in st.session_state or "constituency" not in st.session_state:
+    st.error("⚠️ Please go back to the Dashboard page and select District & Constituency.")
+    st.stop()
+
+district = st.session_state["district"]
+constituency = st.session_state["constituency"]
+st.title(f"🔀 What-if Alliance Simulator – {constituency}")
+
+if not is_unlocked(constituency_passwords(), district, constituency):
+    st.warning(f"🔒 Unlock **{constituency}** on the Booth Analysis page first.")
+    st.stop()
+
+try:
+    dataset = load_dataset(district, constituency)
+except FileNotFoundError as e:
+    st.error(f"❌ {e}")
+    st.stop()
+
+if not dataset["years"]:
+    st.error("No CSV data available. Please check file paths and CSV format.")
+    st.stop()
+
+STANDALONE = "(standalone)"
+STRENGTHS = [label for _, label in STRENGTH_LEVELS] + [WEAK_LABEL]
+
+
+# ---------------------------------------------------------------
+# Scenario editor: widgets rerun only this fragment
+# ---------------------------------------------------------------
+@st.fragment
+def scenario_panel(dataset, year):
+    pv = party_votes(dataset)[year]
+    base_alliances = Scenario().alliances_for(year)
+    member_of = {p.upper(): a for a, members in base_alliances.items() for p in members}
+
+    totals = pd.Series(pv.votes.sum(axis=0), index=pv.parties).drop(["OTHERS", "NOTA"], errors="ignore")
+    totals = totals[totals > 0].sort_values(ascending=False)
+    options = list(base_alliances) + ["OTHERS", STANDALONE]
+
+    st.subheader("🤝 Party → alliance")
+    editor = st.data_editor(
+        pd.DataFrame({
+            "Party": totals.index,
+            "Votes": totals.to_numpy(),
+            "Alliance": [member_of.get(p, "OTHERS") for p in totals.index],
+        }),
+        column_config={
+            "Party": st.column_config.TextColumn(disabled=True),
+            "Votes": st.column_config.NumberColumn(disabled=True, format="%d"),
+            "Alliance": st.column_config.SelectboxColumn(options=options, required=True),
+        },
+        hide_index=True,
+        key=f"scenario_alliances_{year}",
+    )
+    alliances = {}
+    for party, alliance in zip(editor["Party"], editor["Alliance"]):
+        if alliance == "OTHERS":
+            continue
+        alliances.setdefault(party if alliance == STANDALONE else alliance, []).append(party)
+
+    st.subheader("↪️ Vote transfer")
+    c1, c2 = st.columns([1, 2])
+    source = c1.selectbox("Party whose votes move", ["(none)"] + list(totals.index), key=f"transfer_src_{year}")
+    transfers = []
+    if source != "(none)":
+        targets = [a for a in list(alliances) + ["NOTA", "OTHERS"] if source not in alliances.get(a, [])]
+        with c2:
+            for target in targets:
+                pct = st.slider(f"% of {source} votes to {target}", 0, 100, 0, step=5, key=f"transfer_{year}_{source}_{target}")
+                if pct:
+                    transfers.append((year, source, target, pct / 100))
+        if sum(t[3] for t in transfers) > 1:
+            st.error("Transfers add up to more than 100% of the party's votes.")
+            return
+
+    result = simulate(dataset, Scenario(alliances={year: alliances}, transfers=tuple(transfers)))
+    diff = compare(dataset["booth_table"], result, year)
+
+    st.subheader(f"📊 {year}: booths won")
+    won = pd.DataFrame({
+        "Baseline": diff["Baseline Winner"].value_counts(),
+        "Scenario": diff["Scenario Winner"].value_counts(),
+    }).fillna(0).astype(int)
+    won["Change"] = won["Scenario"] - won["Baseline"]
+    c1, c2 = st.columns([2, 1])
+    c1.dataframe(won.sort_values("Scenario", ascending=False), use_container_width=True)
+    c2.metric("Booths flipped", int(diff["Flipped"].sum()), help="Winner differs from the configured alliances")
+
+    st.subheader("🏷️ Booth strength (all years)")
+    strength = pd.DataFrame({
+        "Baseline": dataset["leaderboard"]["Strength"].value_counts(),
+        "Scenario": result.leaderboard["Strength"].value_counts(),
+    }).reindex(STRENGTHS).fillna(0).astype(int)
+    st.dataframe(strength, use_container_width=True)
+
+    flipped = diff[diff["Flipped"]]
+    st.subheader(f"🔁 Flipped booths ({len(flipped)})")
+    st.dataframe(flipped.drop(columns="Flipped"), hide_index=True, use_container_width=True)
+    with st.expander("All booths"):
+        st.dataframe(diff, hide_index=True, use_container_width=True)
+
+
+year = st.selectbox("Election year", dataset["years"][::-1])
+scenario_panel(dataset, year)
+
+# ---------------------------------------------------------------
+# Sidebar Logout
+# ---------------------------------------------------------------
+with st.sidebar:
+    st.markdown("---")
+    if st.button("Logout"):
+        st.switch_page("3_Logout")
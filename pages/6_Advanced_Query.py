@@ -0,0 +1,91 @@
+# pages/6_Advanced_Query.py
+import streamlit as st
+import pandas as pd
+
+import os
+import sys
+
+# make the repo-level utils package importable when Streamlit runs this page
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.alliances import MAIN_ALLIANCES
+from utils.electiondb import DEFAULT_DB_PATH, build, query, share_change
+from utils.manifest import districts as list_districts
+
+# ---------------------------------------------------------------
+# Page setup
+# ---------------------------------------------------------------
+st.set_page_config(page_title="Advanced Query", layout="wide")
+
+if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
+    st.warning("Please login to continue.")
+    st.link_button("🔐 Go to Login Page", "/1_Login")
+    st.stop()
+
+# the database spans every constituency, password-protected ones included
+if st.session_state.get("user") != "admin":
+    st.error("🔒 Advanced queries are available to the admin user only.")
+    st.stop()
+
+st.title("🧮 Advanced Query")
+
+with st.sidebar:
+    st.caption(f"Database: {DEFAULT_DB_PATH}")
+    if st.button("🔄 Update database"):
+        with st.spinner("Loading changed Form-20 files…"):
+            summary = build()
+        st.success(f"Loaded {summary['loaded']} files, skipped {summary['skipped']} unchanged.")
+        for err in summary["errors"]:
+            st.warning(err)
+
+if not os.path.exists(DEFAULT_DB_PATH):
+    st.info("No election database yet – use **Update database** in the sidebar "
+            "(or run `python -m utils.electiondb build`).")
+    st.stop()
+
+years = query("SELECT DISTINCT year FROM election ORDER BY year")["year"].tolist()
+
+# ---------------------------------------------------------------
+# Alliance share change between two elections
+# ---------------------------------------------------------------
+st.subheader("📉 Alliance share change between elections")
+c1, c2, c3, c4, c5 = st.columns(5)
+alliance = c1.selectbox("Alliance", MAIN_ALLIANCES + ["OTHERS"])
+from_year = c2.selectbox("From", years, index=0)
+to_year = c3.selectbox("To", years, index=len(years) - 1)
+min_drop = c4.number_input("Dropped at least (points)", min_value=0.0, max_value=100.0, value=10.0, step=1.0)
+district = c5.selectbox("District", ["(all)"] + list_districts())
+
+result = share_change(alliance, from_year, to_year, min_drop=min_drop,
+                      district=None if district == "(all)" else district)
+st.caption(f"{len(result)} booths")
+st.dataframe(result, hide_index=True, use_container_width=True)
+
+# ---------------------------------------------------------------
+# Free-form SQL (read-only connection)
+# ---------------------------------------------------------------
+st.subheader("🔎 SQL")
+st.caption("Tables: election, constituency, booth, party, candidate, votes, booth_total, "
+           "alliance_member, booth_alliance · view: booth_alliance_share")
+sql = st.text_area(
+    "Query",
+    value="SELECT year, alliance, SUM(votes) AS votes\nFROM booth_alliance_share\n"
+          "GROUP BY year, alliance\nORDER BY year, votes DESC",
+    height=140,
+)
+if st.button("Run query"):
+    try:
+        df = query(sql)
+    except Exception as e:
+        st.error(f"❌ {e}")
+    else:
+        st.caption(f"{len(df)} rows")
+        st.dataframe(df, hide_index=True, use_container_width=True)
+        st.download_button("⬇️ Download CSV", df.to_csv(index=False), file_name="query.csv", mime="text/csv")
+
+# ---------------------------------------------------------------
+# Sidebar Logout
+# ---------------------------------------------------------------
+with st.sidebar:
+    st.markdown("---")
+    if st.button("Logout"):
+        st.switch_page("3_Logout")
@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# keep the parse cache (and everything placed next to it) out of the repo's .cache;
+# must run before utils.parse_cache reads the variable at import
+os.environ.setdefault("BOOTH_CACHE_DIR", os.path.join(tempfile.mkdtemp(prefix="booth-tests-"), "form20"))
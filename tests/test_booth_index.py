@@ -0,0 +1,40 @@
+# tests/test_booth_index.py
+import pytest
+
+from utils.booth_index import BoothIndex, natural_key
+
+LABELS = {
+    "1": ["1"],
+    "2": ["Panchayat Union School, Kallathur"],
+    "10": ["10(A)", "Govt High School Annexe"],
+    "11": [],
+    "12": ["12(A)", "ANGANWADI Centre"],
+    "12A": ["12A", "Community Hall, Kallathur North"],
+    "101": ["101(A)", "Village Office"],
+    "120": ["school road"],
+    "B7": ["Temporary booth"],
+}
+
+
+def reference(labels, query):
+    """Number-prefix matches in natural order, then case-insensitive station-text matches."""
+    booths = sorted(labels, key=natural_key)
+    query = query.strip()
+    if not query:
+        return booths
+    prefix = [b for b in booths if b.startswith(query)]
+    text = sorted(filter(lambda b: query.lower() in " ".join(labels[b]).lower() and b not in prefix, booths),
+                  key=natural_key)
+    return prefix + text
+
+
+@pytest.mark.parametrize("query", ["", "1", "12", "12A", "10(", "(a)", "(A)", "school", "SCHOOL",
+                                   "kallathur", "B", "b7", "zzz", " 2 "])
+def test_search_matches_reference(query):
+    assert BoothIndex(LABELS).search(query) == reference(LABELS, query)
+
+
+def test_natural_order_and_limit():
+    index = BoothIndex(LABELS)
+    assert index.booths == ["1", "2", "10", "11", "12", "101", "120", "12A", "B7"]
+    assert index.search("1", limit=3) == ["1", "10", "11"]
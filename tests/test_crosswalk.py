@@ -0,0 +1,60 @@
+# tests/test_crosswalk.py
+import os
+
+import pytest
+
+from benchmarks.synthetic import LAYOUTS, station_names, write_constituency
+from utils.booth_table import build_booth_table
+from utils.crosswalk import AUX_SPLIT, NAME_DIFFERS, RENUMBERED, SAME, BoothCrosswalk
+from utils.form20 import parse_form20
+
+BOOTHS, SEED = 200, 7
+RATES = dict(renumber_rate=0.05, rename_rate=0.02)
+
+
+@pytest.fixture(scope="module")
+def all_data(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("form20"))
+    files = write_constituency(root, "D", "C", booths=BOOTHS, seed=SEED, **RATES)
+    out = {}
+    for year, name in files:
+        parsed = parse_form20(os.path.join(root, "D", "C", name))
+        out[year] = {"data": parsed["data"], "candidates": parsed["candidates"], "polling_col": parsed["polling_col"]}
+    return out
+
+
+def _changes():
+    before = station_names(BOOTHS, seed=SEED)
+    after = station_names(BOOTHS, seed=SEED, **RATES)
+    moved = {b: next(o for o, n in before.items() if n == after[b])
+             for b in after if after[b] != before[b] and after[b] in before.values()}
+    renamed = {b for b in after if after[b] not in before.values()}
+    return moved, renamed
+
+
+def test_renumbered_booths_matched_by_name(all_data):
+    cw = BoothCrosswalk.from_all_data(all_data)
+    moved, renamed = _changes()
+    assert moved and renamed
+    first = LAYOUTS[0]
+    for booth, old in moved.items():
+        source, confidence, basis = cw.source(booth, first)
+        assert (source, basis) == (str(old), RENUMBERED)
+        assert 0 < confidence <= 0.9
+    for booth in renamed:
+        assert cw.source(booth, first)[1:] == (0.5, NAME_DIFFERS)
+    untouched = set(range(1, BOOTHS + 1)) - set(moved) - renamed
+    assert all(cw.source(b, first)[2] in (SAME, AUX_SPLIT) and cw.source(b, first)[0] == str(b) for b in untouched)
+
+
+def test_align_moves_votes_to_matched_booth(all_data):
+    table = build_booth_table(all_data)
+    aligned = BoothCrosswalk.from_all_data(all_data).align(table)
+    moved, renamed = _changes()
+    first, last = LAYOUTS[0], LAYOUTS[-1]
+    for booth, old in moved.items():
+        assert aligned.loc[(str(booth), first)].equals(table.loc[(str(old), first)])
+        assert aligned.loc[(str(booth), last)].equals(table.loc[(str(booth), last)])
+    untouched = [b for b in range(1, BOOTHS + 1) if b not in moved and b not in renamed]
+    for booth in untouched[:20]:
+        assert aligned.loc[(str(booth), first)].equals(table.loc[(str(booth), first)])
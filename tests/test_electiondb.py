@@ -0,0 +1,42 @@
+# tests/test_electiondb.py
+import time
+
+from benchmarks.synthetic import write_constituency
+from utils.electiondb import build, connect
+from utils.manifest import DATA_DIR
+
+
+def test_booth_alliance_keeps_nota(tmp_path):
+    db = str(tmp_path / "elections.sqlite")
+    build(DATA_DIR, db_path=db, cache_dir=str(tmp_path / "cache"))
+    conn = connect(db, read_only=True)
+    raw = dict(conn.execute("""
+        SELECT ca.election_id || ':' || v.booth_id, SUM(v.votes)
+        FROM votes v
+        JOIN candidate ca ON ca.id = v.candidate_id
+        JOIN party p ON p.id = ca.party_id
+        WHERE p.code = 'NOTA'
+        GROUP BY ca.election_id, v.booth_id
+    """))
+    stored = dict(conn.execute(
+        "SELECT election_id || ':' || booth_id, votes FROM booth_alliance WHERE alliance = 'NOTA'"
+    ))
+    assert raw
+    assert stored == raw
+
+
+def test_reload_drops_orphan_booths(tmp_path):
+    data_dir, db = str(tmp_path / "data"), str(tmp_path / "elections.sqlite")
+    cache_dir = str(tmp_path / "cache")
+    write_constituency(data_dir, "Synthetic", "Shrinking", booths=30, seed=1)
+    build(data_dir, db_path=db, cache_dir=cache_dir)
+    time.sleep(0.01)  # a new mtime for the re-issued sheets
+    write_constituency(data_dir, "Synthetic", "Shrinking", booths=25, seed=1)
+    build(data_dir, db_path=db, cache_dir=cache_dir)
+
+    conn = connect(db, read_only=True)
+    assert conn.execute("SELECT COUNT(*) FROM booth").fetchone()[0] == 25
+    orphans = conn.execute(
+        "SELECT COUNT(*) FROM booth b WHERE NOT EXISTS (SELECT 1 FROM booth_total bt WHERE bt.booth_id = b.id)"
+    ).fetchone()[0]
+    assert orphans == 0
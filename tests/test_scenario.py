@@ -0,0 +1,21 @@
+# tests/test_scenario.py
+import numpy as np
+import pytest
+
+from utils.analytics import load_dataset
+from utils.scenario import Scenario, largest_remainder, simulate
+
+
+def test_largest_remainder_keeps_row_totals():
+    values = np.array([[0.5, 0.5, 2.0], [1 / 3, 1 / 3, 4 / 3], [7.0, 0.0, 0.0]])
+    out = largest_remainder(values, [3, 2, 7])
+    assert out.sum(axis=1).tolist() == [3, 2, 7]
+    assert out.tolist() == [[1, 0, 2], [1, 0, 1], [7, 0, 0]]
+
+
+@pytest.mark.parametrize("fraction", [0.5, 1 / 3, 0.37])
+def test_transfer_keeps_booth_totals(fraction):
+    dataset = load_dataset("Ariyalur", "Jayankondam")
+    result = simulate(dataset, Scenario(transfers=(("2024", "NTK", "DMK+ALLIANCE", fraction),)))
+    baseline = dataset["booth_table"]["total_votes"]
+    assert result.table["total_votes"].reindex(baseline.index).eq(baseline).all()
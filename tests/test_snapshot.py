@@ -0,0 +1,16 @@
+# tests/test_snapshot.py
+from utils.alliances import ALLIANCES_BY_YEAR
+from utils.snapshot import build
+
+
+def test_alliance_change_forces_rebuild(tmp_path, monkeypatch):
+    out = str(tmp_path / "site")
+    assert build(out_dir=out, include_protected=True)["written"] == 1
+    assert build(out_dir=out, include_protected=True)["skipped"] == 1
+
+    year = sorted(ALLIANCES_BY_YEAR)[-1]
+    changed = {name: list(parties) for name, parties in ALLIANCES_BY_YEAR[year].items()}
+    changed[next(iter(changed))].append("NEWPARTY")
+    monkeypatch.setitem(ALLIANCES_BY_YEAR, year, changed)
+    summary = build(out_dir=out, include_protected=True)
+    assert summary["written"] == 1 and summary["skipped"] == 0
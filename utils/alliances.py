@@ -0,0 +1,133 @@
+# utils/alliances.py
+"""Alliance membership per election year and the colours used to draw them."""
+import re
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------
+# Alliances & Colors
+# ---------------------------------------------------------------
+ALLIANCES_BY_YEAR = {
+    "2019": {
+        "AIADMK+ALLIANCE": ["AIADMK", "BJP", "PMK", "DMDK"],
+        "DMK+ALLIANCE": ["DMK", "INC", "VCK", "CPI", "CPI(M)", "MDMK"],
+        "NTK": ["NTK"],
+    },
+    "2021": {
+        "AIADMK+ALLIANCE": ["AIADMK", "BJP", "PMK"],
+        "DMK+ALLIANCE": ["DMK", "INC", "VCK", "CPI", "CPI(M)", "MDMK"],
+        "NTK": ["NTK"],
+    },
+    "2024": {
+        "AIADMK+ALLIANCE": ["AIADMK", "PMK"],
+        "BJP+ALLIANCE": ["BJP", "IJK"],
+        "DMK+ALLIANCE": ["DMK", "INC", "VCK", "CPI(M)"],
+        "NTK": ["NTK"],
+    },
+}
+
+party_color_map = {
+    "DMK": "#d62728",
+    "AIADMK": "#2ca02c",
+    "BJP": "#ff9933",
+    "PMK": "#d3ff0e",
+    "INC": "#00bfff",
+    "VCK": "#1f77b4",
+    "NTK": "#9467bd",
+    "OTHERS": "#c0c0c0",
+    "NOTA": "#808080"
+}
+
+alliance_colors = {
+    "DMK+ALLIANCE": party_color_map["DMK"],
+    "AIADMK+ALLIANCE": party_color_map["AIADMK"],
+    "BJP+ALLIANCE": party_color_map["BJP"],
+    "NTK": party_color_map["NTK"],
+    "NOTA": party_color_map["NOTA"],
+    "OTHERS": party_color_map["OTHERS"]
+}
+
+# Alliances shown individually in multi-year views; everything else is OTHERS
+MAIN_ALLIANCES = ["DMK+ALLIANCE", "AIADMK+ALLIANCE", "BJP+ALLIANCE", "NTK", "NOTA"]
+
+NOTA_ALIASES = {"NOTA", "NONE OF THE ABOVE", "NONE_OF_THE_ABOVE"}
+
+_DUP_SUFFIX = re.compile(r"__DUP\d+$", re.IGNORECASE)
+_PAREN_PARTY = re.compile(r"\s\(([A-Z][A-Z().\- ]*)\)\s*$")
+
+
+# ---------------------------------------------------------------
+# Helpers (robust)
+# ---------------------------------------------------------------
+def party_of(column):
+    """
+    Party code for a candidate column of a cleaned frame.
+
+    load_clean_csv names candidate columns from the Form-20 PARTY row (or the
+    party header of the 2019 layout), de-duplicated with "__dupN". Strip that
+    suffix; if a file only carried candidate names, fall back to a trailing
+    "(PARTY)" in the name.
+    """
+    code = _DUP_SUFFIX.sub("", str(column)).strip().upper()
+    if code in NOTA_ALIASES:
+        return "NOTA"
+    m = _PAREN_PARTY.search(code)
+    return m.group(1).strip() if m else code
+
+
+class AllianceLookup:
+    """
+    Compiled party → alliance mapping for one election year.
+
+    names: alliance names, integer code = position (NOTA and OTHERS included)
+    codes: {PARTY: code}
+    """
+
+    def __init__(self, alliances):
+        self.names = list(alliances) + [a for a in ("NOTA", "OTHERS") if a not in alliances]
+        self.other = self.names.index("OTHERS")
+        self.codes = {"NOTA": self.names.index("NOTA")}
+        for code, alliance in enumerate(self.names):
+            for member in alliances.get(alliance, []):
+                self.codes.setdefault(member.upper(), code)
+
+    def code_of(self, party):
+        return self.codes.get(str(party).upper(), self.other)
+
+    def column_codes(self, candidate_cols):
+        """Integer alliance code for every candidate column, in one pass."""
+        parties = pd.Index([party_of(c) for c in candidate_cols])
+        return parties.map(self.codes).fillna(self.other).to_numpy(dtype=np.int64)
+
+    def one_hot(self, candidate_cols):
+        """candidates × alliances 0/1 matrix; votes @ one_hot folds candidates into alliances."""
+        codes = self.column_codes(candidate_cols)
+        out = np.zeros((len(codes), len(self.names)), dtype=np.int64)
+        out[np.arange(len(codes)), codes] = 1
+        return out
+
+
+def compile_alliances(alliances_by_year=None):
+    """{year: AllianceLookup} for an alliance config (defaults to ALLIANCES_BY_YEAR)."""
+    alliances_by_year = ALLIANCES_BY_YEAR if alliances_by_year is None else alliances_by_year
+    return {str(year): AllianceLookup(alliances) for year, alliances in alliances_by_year.items()}
+
+
+ALLIANCE_LOOKUP = compile_alliances()
+
+
+def lookup_for(year, lookups=None):
+    lookups = ALLIANCE_LOOKUP if lookups is None else lookups
+    return lookups.get(str(year)) or AllianceLookup({})
+
+
+def get_alliance(party, year):
+    lookup = lookup_for(year)
+    return lookup.names[lookup.code_of(party_of(party))]
+
+
+def column_alliances(candidate_cols, year, lookups=None):
+    """Alliance for each candidate column of a cleaned frame (NOTA kept separately)."""
+    lookup = lookup_for(year, lookups)
+    return [lookup.names[c] for c in lookup.column_codes(candidate_cols)]
@@ -0,0 +1,216 @@
+# utils/analytics.py
+"""
+Headless booth / constituency analytics.
+
+Everything the Booth Analysis page shows is computed here as plain result
+objects – no Streamlit, no plotly – so it can be cached, batched and
+benchmarked. Pages only render BoothReport / ConstituencyReport.
+
+    report = analyze_booth("Ariyalur", "Jayankondam", "12")
+    report.years[0].winner, report.summary.strength
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from utils.booth_table import booth_rows, booth_trend, table_alliances
+from utils.dataset_cache import load_constituency_data
+from utils.leaderboard import strength_label
+from utils.manifest import DATA_DIR, constituency_files, constituency_folder
+from utils.perf import PERF, hit_rate
+
+
+@dataclass(frozen=True)
+class YearResult:
+    """One booth in one election."""
+    year: str
+    alliance_votes: dict  # alliance -> votes, largest first, zero entries dropped
+    total_votes: int
+    polled_votes: int
+    total_voters: int
+    turnout_pct: float
+    winner: str | None
+    runner_up: str | None
+    margin_votes: int
+    margin_pct: float
+
+
+@dataclass(frozen=True)
+class BoothSummary:
+    """The multi-year "Historical Summary" for a booth."""
+    dominant: str
+    avg_share: float
+    volatility: float
+    polarization: float
+    strength: str
+
+
+@dataclass(frozen=True)
+class BoothReport:
+    booth: str
+    years: tuple            # YearResult per election with votes, oldest first
+    missing: tuple          # (year, "no_data" | "no_votes") for skipped elections
+    trend: pd.DataFrame     # year × alliance vote share (%), majors then OTHERS
+    summary: BoothSummary | None
+    matches: tuple = ()     # (year, source booth, confidence, basis) where the crosswalk isn't a plain match
+
+
+@dataclass(frozen=True)
+class ConstituencyReport:
+    district: str
+    constituency: str
+    years: list
+    booth_count: int
+    alliance_votes: pd.DataFrame   # year × alliance total votes
+    alliance_share: pd.DataFrame   # year × alliance vote share (%)
+    leaderboard: pd.DataFrame      # one row per booth, see utils/leaderboard.py
+    problems: list = field(default_factory=list)
+
+
+def summarize_trend(trend):
+    """BoothSummary from a year × alliance share frame (None if empty)."""
+    if trend.empty:
+        return None
+    avg_shares = trend.mean().sort_values(ascending=False)
+    dominant = avg_shares.index[0]
+    volatility = trend.diff().abs().mean().mean()
+    last_votes = trend.iloc[-1].sort_values(ascending=False)
+    polarization = float(last_votes.iloc[0] - (last_votes.iloc[1] if len(last_votes) > 1 else 0))
+    return BoothSummary(
+        dominant=dominant,
+        avg_share=float(avg_shares[dominant]),
+        volatility=float(volatility),
+        polarization=polarization,
+        strength=strength_label(avg_shares[dominant]),
+    )
+
+
+def booth_report(dataset, booth_number):
+    """
+    BoothReport for one booth of a loaded dataset (see dataset_cache.load_constituency_data).
+    Years are joined through the dataset's crosswalk, so a renumbered or split
+    station is followed to its number in each election.
+    """
+    booth_number = str(booth_number)
+    table = dataset.get("aligned_table", dataset["booth_table"])
+    rows = booth_rows(table, booth_number)
+    alliances = table_alliances(table)
+
+    years, missing = [], []
+    for year in dataset["years"]:
+        if year not in rows.index:
+            missing.append((year, "no_data"))
+            continue
+        r = rows.loc[year]
+        if int(r["total_votes"]) == 0:
+            missing.append((year, "no_votes"))
+            continue
+        votes = r[alliances].astype(int)
+        votes = votes[votes > 0].sort_values(ascending=False, kind="stable")
+        years.append(YearResult(
+            year=year,
+            alliance_votes={a: int(v) for a, v in votes.items()},
+            total_votes=int(r["total_votes"]),
+            polled_votes=int(r["polled_votes"]),
+            total_voters=int(r["total_voters"]),
+            turnout_pct=float(r["turnout_pct"]),
+            winner=r["winner"],
+            runner_up=r["runner_up"],
+            margin_votes=int(r["margin_votes"]),
+            margin_pct=float(r["margin_pct"]),
+        ))
+
+    crosswalk = dataset.get("crosswalk")
+    matches = tuple(
+        (year, src, conf, basis)
+        for year, (src, conf, basis) in (crosswalk.matches(booth_number).items() if crosswalk else ())
+        if (src, conf) != (booth_number, 1.0)
+    )
+    trend = booth_trend(rows)
+    return BoothReport(
+        booth=booth_number,
+        years=tuple(years),
+        missing=tuple(missing),
+        trend=trend,
+        summary=summarize_trend(trend),
+        matches=matches,
+    )
+
+
+# Reports are small and deterministic for a given dataset, so keep recent ones.
+_REPORT_MEMO_SIZE = 4096
+_report_memo = OrderedDict()
+_memo_lock = threading.Lock()
+_memo_counts = {"hits": 0, "misses": 0}
+
+
+def cached_booth_report(dataset, booth_number):
+    """booth_report memoised across sessions on (dataset key, booth)."""
+    key = (dataset.get("key"), str(booth_number))
+    with _memo_lock:
+        if key in _report_memo:
+            _report_memo.move_to_end(key)
+            _memo_counts["hits"] += 1
+            return _report_memo[key]
+        _memo_counts["misses"] += 1
+    with PERF.timer("booth_report"):
+        report = booth_report(dataset, booth_number)
+    with _memo_lock:
+        _report_memo[key] = report
+        while len(_report_memo) > _REPORT_MEMO_SIZE:
+            _report_memo.popitem(last=False)
+    return report
+
+
+def report_memo_stats():
+    with _memo_lock:
+        return hit_rate(_memo_counts["hits"], _memo_counts["misses"])
+
+
+def invalidate_reports(folder_path=None):
+    """Drop memoised reports (all, or only those built from folder_path's dataset)."""
+    folder_path = folder_path and os.path.abspath(folder_path)
+    with _memo_lock:
+        doomed = [k for k in _report_memo
+                  if folder_path is None or (k[0] is not None and k[0][0] == folder_path)]
+        for k in doomed:
+            del _report_memo[k]
+    return len(doomed)
+
+
+def load_dataset(district, constituency, data_dir=DATA_DIR):
+    """Shared (cached) dataset for a constituency, located through the manifest."""
+    folder = constituency_folder(district, constituency, data_dir)
+    if not os.path.isdir(folder):
+        raise FileNotFoundError(f"Data folder not found: {folder}")
+    return load_constituency_data(folder, constituency_files(district, constituency, data_dir))
+
+
+def analyze_booth(district, constituency, booth_number, data_dir=DATA_DIR):
+    return cached_booth_report(load_dataset(district, constituency, data_dir), booth_number)
+
+
+def constituency_report(dataset, district, constituency):
+    """ConstituencyReport for a loaded dataset."""
+    table = dataset["booth_table"]
+    alliances = table_alliances(table)
+    by_year = table.groupby(level="year")[alliances].sum()
+    by_year = by_year.loc[:, by_year.sum(axis=0) > 0]
+    share = by_year.div(by_year.sum(axis=1), axis=0).fillna(0) * 100
+    return ConstituencyReport(
+        district=district,
+        constituency=constituency,
+        years=list(dataset["years"]),
+        booth_count=int(table.index.get_level_values("BoothGroup").nunique()),
+        alliance_votes=by_year,
+        alliance_share=share,
+        leaderboard=dataset["leaderboard"],
+        problems=list(dataset["problems"]),
+    )
+
+
+def analyze_constituency(district, constituency, data_dir=DATA_DIR):
+    return constituency_report(load_dataset(district, constituency, data_dir), district, constituency)
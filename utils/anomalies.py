@@ -0,0 +1,256 @@
+# utils/anomalies.py
+"""
+Data-quality scan over every booth and year of a constituency.
+
+Runs as whole-table passes over the booth × year table (see
+utils/booth_table.py) and the share cube (see utils/leaderboard.py), never
+booth by booth:
+
+  turnout_over_100  polled votes exceed electors
+  high_turnout      turnout above HIGH_TURNOUT_PCT
+  turnout_outlier   turnout far from the constituency's that year (robust z)
+  sum_mismatch      candidate votes don't add up to the sheet's TOTAL VOTES
+  extreme_swing     an alliance's share moved far more than in other booths
+  nota_spike        NOTA share far above the constituency's that year
+
+"Robust z" is 0.6745 · (x − median) / MAD, computed per year (and alliance)
+across booths, so a handful of broken booths can't hide themselves by
+inflating the spread.
+
+Turnout is only checked for years whose sheet has an electors column; when
+the electors column just repeats the polled votes (turnout ≈ 100%
+everywhere), those years are skipped.
+
+    flags = dataset_anomalies(dataset)   # or scan_anomalies(booth_table, years)
+    flags.head()   # Booth, Year, Check, Severity, Score, Value, Expected, Detail
+"""
+import threading
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.booth_table import table_alliances
+from utils.leaderboard import share_cube, sort_booths
+from utils.perf import timed
+
+HIGH_TURNOUT_PCT = 95.0
+ROBUST_Z = 3.5          # |robust z| above which a value counts as extreme
+MIN_SWING_PCT = 10.0    # ...and a share must also have moved at least this much
+MIN_NOTA_PCT = 2.0      # ...and NOTA must be at least this share of the votes
+MISMATCH_TOLERANCE = 0  # votes of slack before a candidate-sum mismatch is flagged
+
+# check -> severity; flags are ranked by severity, then by score
+CHECKS = {
+    "turnout_over_100": "high",
+    "sum_mismatch": "high",
+    "high_turnout": "medium",
+    "extreme_swing": "medium",
+    "nota_spike": "low",
+    "turnout_outlier": "low",
+}
+SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+COLUMNS = ["Booth", "Year", "Check", "Severity", "Score", "Value", "Expected", "Detail"]
+
+
+def robust_z(values, axis=0):
+    """
+    Robust z-scores of values along axis (NaN ignored). Where the MAD is 0
+    (most values identical) the mean absolute deviation stands in; where that
+    is 0 too every score is 0.
+    """
+    values = np.asarray(values, dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN slices
+        median = np.nanmedian(values, axis=axis, keepdims=True)
+        dev = np.abs(values - median)
+        mad = np.nanmedian(dev, axis=axis, keepdims=True)
+        meanad = np.nanmean(dev, axis=axis, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(mad > 0, 0.6745 * (values - median) / mad,
+                     np.where(meanad > 0, (values - median) / (1.2533 * meanad), 0.0))
+    return z, np.broadcast_to(median, values.shape)
+
+
+def _frame(booths, years, check, score, value, expected, detail):
+    if len(booths) == 0:
+        return None
+    return pd.DataFrame({
+        "Booth": np.asarray(booths, dtype=object).astype(str),
+        "Year": np.asarray(years, dtype=object).astype(str),
+        "Check": check,
+        "Severity": CHECKS[check],
+        "Score": np.round(np.asarray(score, dtype=float), 2),
+        "Value": np.round(np.asarray(value, dtype=float), 2),
+        "Expected": np.round(np.asarray(expected, dtype=float), 2),
+        "Detail": detail,
+    })
+
+
+def _electors_known(table):
+    """Per-row bool: the year's sheet has an electors column distinct from polled votes."""
+    same = (table["total_voters"] == table["polled_votes"]).groupby(level="year").mean()
+    known_years = same.index[same < 0.5]
+    return table.index.get_level_values("year").isin(known_years)
+
+
+def _turnout_checks(table):
+    known = _electors_known(table) & (table["total_voters"].to_numpy() > 0)
+    t = table[known]
+    if t.empty:
+        return []
+    booths = t.index.get_level_values("BoothGroup")
+    years = t.index.get_level_values("year")
+    turnout = t["polled_votes"].to_numpy() / t["total_voters"].to_numpy() * 100
+
+    # robust z per year: one column per year, booths down the rows
+    wide = pd.Series(turnout, index=t.index).unstack("year")
+    z_wide, med_wide = robust_z(wide.to_numpy(), axis=0)
+    z = pd.DataFrame(z_wide, index=wide.index, columns=wide.columns).stack().reindex(t.index).to_numpy()
+    med = pd.DataFrame(med_wide, index=wide.index, columns=wide.columns).stack().reindex(t.index).to_numpy()
+
+    out = []
+    over = turnout > 100
+    out.append(_frame(
+        booths[over], years[over], "turnout_over_100", np.maximum(np.abs(z[over]), turnout[over] - 100),
+        turnout[over], med[over],
+        [f"{p:,} polled of {e:,} electors" for p, e in
+         zip(t["polled_votes"].to_numpy()[over], t["total_voters"].to_numpy()[over])],
+    ))
+    high = (turnout > HIGH_TURNOUT_PCT) & ~over
+    out.append(_frame(
+        booths[high], years[high], "high_turnout", np.maximum(np.abs(z[high]), turnout[high] - HIGH_TURNOUT_PCT),
+        turnout[high], med[high], f"turnout above {HIGH_TURNOUT_PCT:g}%",
+    ))
+    odd = (np.abs(z) >= ROBUST_Z) & ~over & ~high
+    out.append(_frame(
+        booths[odd], years[odd], "turnout_outlier", np.abs(z[odd]), turnout[odd], med[odd],
+        np.where(z[odd] > 0, "turnout unusually high", "turnout unusually low"),
+    ))
+    return out
+
+
+def _sum_checks(table):
+    diff = table["total_votes"].to_numpy() - table["polled_votes"].to_numpy()
+    bad = np.abs(diff) > MISMATCH_TOLERANCE
+    if not bad.any():
+        return []
+    t = table[bad]
+    polled = t["polled_votes"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel = np.where(polled > 0, np.abs(diff[bad]) / polled * 100, 100.0)
+    return [_frame(
+        t.index.get_level_values("BoothGroup"), t.index.get_level_values("year"), "sum_mismatch",
+        rel, t["total_votes"].to_numpy(), polled,
+        [f"candidates add up to {c:,}, TOTAL VOTES says {p:,} ({d:+,})"
+         for c, p, d in zip(t["total_votes"].to_numpy(), polled, diff[bad])],
+    )]
+
+
+def _swing_checks(table, years):
+    booths, alliances, shares, valid = share_cube(table, years)
+    n_b, n_y, n_a = shares.shape
+    if n_b == 0 or n_y < 2:
+        return []
+
+    # swing against each booth's previous year with votes, as the leaderboard does
+    swing = np.full((n_b, n_y, n_a), np.nan)
+    prev = np.full((n_b, n_a), np.nan)
+    prev_year = np.full(n_b, -1)
+    for y in range(n_y):
+        has_prev = valid[:, y] & (prev_year >= 0)
+        swing[has_prev, y, :] = shares[has_prev, y, :] - prev[has_prev]
+        prev = np.where(valid[:, y][:, None], shares[:, y, :], prev)
+        prev_year = np.where(valid[:, y], y, prev_year)
+
+    z, med = robust_z(swing, axis=0)  # per year and alliance, across booths
+    extreme = (np.abs(z) >= ROBUST_Z) & (np.abs(swing) >= MIN_SWING_PCT)
+    # one flag per booth-year: its most extreme alliance
+    score = np.where(extreme, np.abs(z), -np.inf)
+    worst = np.argmax(score, axis=2)
+    b, y = np.nonzero(np.isfinite(np.take_along_axis(score, worst[:, :, None], axis=2)[:, :, 0]))
+    if len(b) == 0:
+        return []
+    a = worst[b, y]
+    year_labels = np.array([str(v) for v in years], dtype=object)
+    names = np.array(alliances, dtype=object)
+    return [_frame(
+        booths[b], year_labels[y], "extreme_swing", np.abs(z[b, y, a]), swing[b, y, a], med[b, y, a],
+        [f"{n} {s:+.1f} pts (typical {m:+.1f})" for n, s, m in zip(names[a], swing[b, y, a], med[b, y, a])],
+    )]
+
+
+def _nota_checks(table):
+    if "NOTA" not in table_alliances(table):
+        return []
+    t = table[table["total_votes"] > 0]
+    share = pd.Series(t["NOTA"].to_numpy() / t["total_votes"].to_numpy() * 100, index=t.index)
+    wide = share.unstack("year")
+    z_wide, med_wide = robust_z(wide.to_numpy(), axis=0)
+    z = pd.DataFrame(z_wide, index=wide.index, columns=wide.columns)
+    med = pd.DataFrame(med_wide, index=wide.index, columns=wide.columns)
+    prev = wide.shift(1, axis=1)
+
+    spike = (z.to_numpy() >= ROBUST_Z) & (wide.to_numpy() >= MIN_NOTA_PCT)
+    b, y = np.nonzero(spike)
+    if len(b) == 0:
+        return []
+    prev_vals = prev.to_numpy()[b, y]
+    return [_frame(
+        wide.index[b], wide.columns[y], "nota_spike", z.to_numpy()[b, y], wide.to_numpy()[b, y],
+        med.to_numpy()[b, y],
+        [f"NOTA {v:.1f}%" + (f" (was {p:.1f}%)" if np.isfinite(p) else "")
+         for v, p in zip(wide.to_numpy()[b, y], prev_vals)],
+    )]
+
+
+@timed("anomaly_scan")
+def scan_anomalies(booth_table, years, aligned_table=None):
+    """
+    Every flag for every booth and year, ranked: severity first, then score
+    (robust |z|, or how far past the threshold for rule checks), then booth.
+    Swings are measured on aligned_table (the crosswalk-aligned table, see
+    utils/crosswalk.py) when given, so renumbered stations aren't compared
+    with a different place.
+    """
+    swing_table = booth_table if aligned_table is None else aligned_table
+    frames = [
+        f for f in (*_turnout_checks(booth_table), *_sum_checks(booth_table),
+                    *_swing_checks(swing_table, years), *_nota_checks(booth_table))
+        if f is not None
+    ]
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    flags = sort_booths(pd.concat(frames, ignore_index=True))
+    rank = flags["Severity"].map(SEVERITY_RANK)
+    return (flags.assign(_rank=rank).sort_values(["_rank", "Score"], ascending=[True, False], kind="stable")
+            .drop(columns="_rank").reset_index(drop=True))
+
+
+def anomaly_counts(flags):
+    """Number of flags per check, in CHECKS order (zero counts dropped)."""
+    counts = flags["Check"].value_counts()
+    return {c: int(counts[c]) for c in CHECKS if c in counts}
+
+
+_MEMO_SIZE = 16
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def dataset_anomalies(dataset):
+    """scan_anomalies for a loaded dataset, memoised on the dataset key."""
+    key = dataset.get("key")
+    with _memo_lock:
+        if key is not None and key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    flags = scan_anomalies(dataset["booth_table"], dataset["years"], dataset.get("aligned_table"))
+    if key is not None:
+        with _memo_lock:
+            _memo[key] = flags
+            while len(_memo) > _MEMO_SIZE:
+                _memo.popitem(last=False)
+    return flags
@@ -1,5 +1,15 @@
+import json
+import os
+import time
+
 import streamlit as st
 
+from utils.perf import PERF
+
+# per-constituency passwords: {district: {constituency: password}}
+PASSWORDS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "passwords.json"))
+
+
 def logout_button():
     """Reusable logout button that clears session and returns to login page."""
     with st.sidebar:
@@ -10,3 +20,62 @@ def logout_button():
                     del st.session_state[key]
             st.success("✅ Logged out successfully!")
             st.switch_page("1_Login")
+
+
+@st.cache_data(show_spinner=False)
+def load_passwords(path, mtime_ns):
+    # mtime_ns is only part of the cache key: an edited file is re-read
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def constituency_passwords():
+    """passwords.json, cached until the file changes; stops the page if it can't be read."""
+    try:
+        with PERF.timer("password_check"):
+            return load_passwords(PASSWORDS_FILE, os.stat(PASSWORDS_FILE).st_mtime_ns)
+    except Exception as e:
+        st.error(f"❌ Cannot read passwords.json: {e}")
+        st.stop()
+
+
+def is_unlocked(passwords, district, constituency):
+    """True if the constituency has no password or was unlocked this session."""
+    if not passwords.get(district, {}).get(constituency):
+        return True
+    return st.session_state.get(f"unlocked_{district}_{constituency}", False)
+
+
+def require_unlocked(district, constituency):
+    """
+    Constituency-level password gate: asks for the password until it is
+    entered and stops the page before any data is loaded.
+    """
+    key = f"unlocked_{district}_{constituency}"
+    expected_password = constituency_passwords().get(district, {}).get(constituency, None)
+
+    # If constituency is protected
+    if expected_password:
+        # If not already unlocked in session
+        if not st.session_state.get(key, False):
+            st.warning(f"🔒 Access to **{constituency}** constituency requires a password.")
+            entered_password = st.text_input("Enter Constituency Password:", type="password")
+
+            if st.button("🔓 Unlock Constituency"):
+                if entered_password == expected_password:
+                    st.session_state[key] = True
+                    st.success("✅ Access granted! Loading booth data...")
+                    time.sleep(0.5)
+                    st.rerun()
+                else:
+                    st.error("❌ Incorrect password. Access denied.")
+                    st.stop()
+            else:
+                st.stop()  # ❗ Block CSV loading until button is pressed
+    else:
+        # Constituency not protected, allow access
+        st.session_state[key] = True
+
+    if not st.session_state.get(key, False):
+        st.error("🔐 You must unlock this constituency before accessing data.")
+        st.stop()
@@ -0,0 +1,152 @@
+# utils/booth_index.py
+"""
+Searchable booth index, built once per constituency dataset.
+
+Keeps every BoothGroup in numeric order ("2" before "10") together with the
+polling-station text seen for it in any year – the raw "Polling Station No."
+labels such as "153(A)" and any station name / village column a sheet has.
+Queries are array lookups rather than scans over DataFrames:
+
+    index = BoothIndex.from_all_data(all_data)
+    index.search("15")        # booths whose number starts with 15, then station-text hits
+    index.search("school")    # case-insensitive substring of station text
+"""
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# columns besides the polling-station column that describe the station
+_STATION_TEXT_RE = re.compile(r"NAME|LOCATION|VILLAGE|STATION|ADDRESS", re.IGNORECASE)
+_SEP = "\n"
+
+
+def natural_key(booth):
+    """Sort key: numeric booths by value, then anything non-numeric by text."""
+    booth = str(booth)
+    return (0, int(booth), "") if booth.isdigit() else (1, 0, booth)
+
+
+def natural_sort(booths):
+    """booths (strings, any order) sorted by natural_key, vectorised."""
+    arr = np.asarray(list(booths), dtype=str)
+    if not len(arr):
+        return []
+    digits = np.char.isdigit(arr)
+    nums, rest = arr[digits], np.sort(arr[~digits])
+    nums = nums[np.argsort(nums.astype(np.int64), kind="stable")]
+    return nums.tolist() + rest.tolist()
+
+
+def booth_values(df):
+    """Distinct BoothGroup labels of a frame as a str array (categories when categorical)."""
+    booth = df["BoothGroup"]
+    if isinstance(booth.dtype, pd.CategoricalDtype):
+        return np.asarray(booth.cat.categories, dtype=str)
+    return booth.astype(str).unique().to_numpy(dtype=str)
+
+
+def _station_columns(df, polling_col):
+    cols = [polling_col] if polling_col in df.columns else []
+    for c in df.columns:
+        if c in cols or c == "BoothGroup" or pd.api.types.is_numeric_dtype(df[c]):
+            continue
+        if _STATION_TEXT_RE.search(str(c)):
+            cols.append(c)
+    return cols
+
+
+class BoothIndex:
+    def __init__(self, labels):
+        """labels: {booth: [station text, ...]}."""
+        self.booths = natural_sort(labels)
+        self._labels = [list(dict.fromkeys(labels[b])) for b in self.booths]
+        self._pos = {b: i for i, b in enumerate(self.booths)}
+
+        # prefix search: booth numbers sorted as strings, mapped back to numeric order
+        lex = np.array(self.booths, dtype=object)
+        order = np.argsort(lex.astype(str), kind="stable")
+        self._lex = lex.astype(str)[order]
+        self._lex_pos = order
+
+        # substring search: one lowercase blob, hits mapped to booths by offset
+        texts = [" ".join(ls).lower() for ls in self._labels]
+        self._blob = _SEP.join(texts)
+        self._starts = np.cumsum([0] + [len(t) + len(_SEP) for t in texts[:-1]]) if texts else np.array([], dtype=int)
+
+    @classmethod
+    def from_all_data(cls, all_data):
+        """Index over every year of a loaded constituency (see dataset_cache)."""
+        booths, pairs = [], []
+        for info in all_data.values():
+            df = info["data"]
+            booth = df["BoothGroup"].astype(str)
+            booths.append(booth_values(df))
+            cols = _station_columns(df, info.get("polling_col"))
+            if not cols:
+                continue
+            text = df[cols[0]].astype(str)
+            for c in cols[1:]:
+                text = text + " " + df[c].astype(str)
+            keep = (text != booth).to_numpy()
+            pairs.append((booth.to_numpy(dtype=object)[keep], text.to_numpy(dtype=object)[keep]))
+        labels = {b: [] for b in np.unique(np.concatenate(booths)).tolist()} if booths else {}
+        for b_arr, t_arr in pairs:
+            for b, t in zip(b_arr, t_arr):
+                labels[b].append(t)
+        return cls(labels)
+
+    def __len__(self):
+        return len(self.booths)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held: the arrays, the search blob and the label strings."""
+        strings = sum(sys.getsizeof(b) for b in self.booths)
+        strings += sum(sys.getsizeof(ls) + sum(sys.getsizeof(t) for t in ls) for ls in self._labels)
+        return (self._lex.nbytes + self._lex_pos.nbytes + np.asarray(self._starts).nbytes
+                + sys.getsizeof(self._blob) + sys.getsizeof(self._pos) + sys.getsizeof(self.booths) + strings)
+
+    def __contains__(self, booth):
+        return str(booth) in self._pos
+
+    def labels(self, booth):
+        """Station text recorded for a booth (raw labels other than the bare number)."""
+        return self._labels[self._pos[str(booth)]]
+
+    def display(self, booth):
+        labels = self.labels(booth)
+        return f"{booth} · {', '.join(labels)}" if labels else str(booth)
+
+    def prefix(self, text):
+        """Positions (numeric order) of booths whose number starts with text."""
+        lo = np.searchsorted(self._lex, text, side="left")
+        hi = np.searchsorted(self._lex, text + "￿", side="left")
+        return np.sort(self._lex_pos[lo:hi])
+
+    def contains(self, text):
+        """Positions (numeric order) of booths whose station text contains text."""
+        text = text.lower()
+        if not text or _SEP in text:
+            return np.array([], dtype=int)
+        hits = [m.start() for m in re.finditer(re.escape(text), self._blob)]
+        if not hits:
+            return np.array([], dtype=int)
+        return np.unique(np.searchsorted(self._starts, hits, side="right") - 1)
+
+    def search(self, query, limit=None):
+        """
+        Booths matching query, best matches first: number-prefix matches in
+        numeric order, then station-text matches. An empty query returns every
+        booth. limit caps the result length.
+        """
+        query = str(query).strip()
+        if not query:
+            found = self.booths
+        else:
+            pos = list(self.prefix(query))
+            seen = set(pos)
+            pos += [p for p in self.contains(query) if p not in seen]
+            found = [self.booths[p] for p in pos]
+        return found[:limit] if limit is not None else list(found)
@@ -0,0 +1,145 @@
+# utils/booth_table.py
+"""
+Booth × year summary table, built once per constituency.
+
+Every booth of every year is reduced to one row of alliance votes plus polled
+votes, electors, turnout, winner and margin, so a booth analysis is an index
+lookup instead of a filter + aggregate over the raw frame.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.alliances import MAIN_ALLIANCES, lookup_for
+
+SUMMARY_COLS = [
+    "total_votes", "polled_votes", "total_voters", "turnout_pct",
+    "winner", "runner_up", "margin_votes", "margin_pct",
+]
+
+
+def _total_votes_col(df):
+    return next((c for c in df.columns if "TOTAL" in c.upper() and ("VOTE" in c.upper() or "POLL" in c.upper())), None)
+
+
+def _total_voters_col(df):
+    return next((c for c in df.columns if any(k in c.upper() for k in ["TURNOVER", "REGISTERED", "ELECTORS", "TOTAL VOTERS"])), None)
+
+
+def alliance_order(names):
+    """Majors first (in MAIN_ALLIANCES order), then any others alphabetically, OTHERS last."""
+    names = set(names)
+    majors = [a for a in MAIN_ALLIANCES if a in names]
+    rest = sorted(n for n in names if n not in MAIN_ALLIANCES and n != "OTHERS")
+    return majors + rest + (["OTHERS"] if "OTHERS" in names else [])
+
+
+def _year_table(year, info, lookups=None):
+    df = info["data"]
+    candidate_cols = info["candidates"]
+    booth = df["BoothGroup"].astype(str)
+
+    # booth × candidate, then fold candidates into alliances with one matmul
+    cand = df[candidate_cols].groupby(booth, sort=False).sum()
+    cand = cand.clip(lower=0)  # negative booth sums never count towards an alliance
+    lookup = lookup_for(year, lookups)
+    votes = pd.DataFrame(
+        cand.to_numpy(dtype=np.int64) @ lookup.one_hot(candidate_cols),
+        index=cand.index,
+        columns=lookup.names,
+    )
+
+    out = votes.copy()
+    out["total_votes"] = votes.sum(axis=1)
+
+    total_votes_col = _total_votes_col(df)
+    total_voters_col = _total_voters_col(df)
+    out["polled_votes"] = (
+        df[total_votes_col].groupby(booth, sort=False).sum().reindex(out.index)
+        if total_votes_col else out["total_votes"]
+    )
+    out["total_voters"] = (
+        df[total_voters_col].groupby(booth, sort=False).sum().reindex(out.index)
+        if total_voters_col else out["polled_votes"]
+    )
+    out["year"] = str(year)
+    return out
+
+
+def build_booth_table(all_data, lookups=None):
+    """
+    all_data: {year: {"data": df, "candidates": [...], "polling_col": ...}}
+    lookups: {year: AllianceLookup} (utils.alliances.compile_alliances), default
+    is the configured ALLIANCES_BY_YEAR.
+    Returns a DataFrame indexed by (BoothGroup, year) with one int column per
+    alliance (NOTA and OTHERS included) followed by SUMMARY_COLS.
+    """
+    frames = [_year_table(year, info, lookups) for year, info in sorted(all_data.items(), key=lambda x: int(x[0]))]
+    if not frames:
+        return pd.DataFrame(columns=SUMMARY_COLS, index=pd.MultiIndex.from_arrays([[], []], names=["BoothGroup", "year"]))
+
+    table = pd.concat(frames, sort=False)
+    table.index.name = "BoothGroup"
+    table = table.set_index("year", append=True)
+
+    alliances = alliance_order(c for c in table.columns if c not in SUMMARY_COLS)
+    table[alliances] = table[alliances].fillna(0).astype(np.int64)
+    for c in ["total_votes", "polled_votes", "total_voters"]:
+        table[c] = table[c].fillna(0).astype(np.int64)
+
+    return add_summary(table, alliances).sort_index()
+
+
+def add_summary(table, alliances):
+    """
+    Fill winner, runner_up, margin and turnout columns of a table that already
+    holds int alliance columns plus total_votes / polled_votes / total_voters.
+    Returns the table with columns alliances + SUMMARY_COLS.
+    """
+    # winner / runner-up over alliance votes (stable: ties keep alliance order)
+    mat = table[alliances].to_numpy()
+    order = np.argsort(-mat, axis=1, kind="stable")
+    rows = np.arange(len(mat))
+    top = mat[rows, order[:, 0]] if len(alliances) else np.zeros(len(mat), dtype=np.int64)
+    second = mat[rows, order[:, 1]] if len(alliances) > 1 else np.zeros(len(mat), dtype=np.int64)
+    names = np.array(alliances, dtype=object)
+    table["winner"] = np.where(top > 0, names[order[:, 0]], None) if len(alliances) else None
+    table["runner_up"] = np.where(second > 0, names[order[:, 1]], None) if len(alliances) > 1 else None
+    table["margin_votes"] = (top - second).astype(np.int64)
+
+    polled = table["polled_votes"].to_numpy()
+    voters = table["total_voters"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["turnout_pct"] = np.where(voters != 0, np.round(polled / voters * 100, 2), 0.0)
+        table["margin_pct"] = np.where(polled != 0, np.round(table["margin_votes"].to_numpy() / polled * 100, 2), 0.0)
+
+    return table[alliances + SUMMARY_COLS]
+
+
+def table_alliances(table):
+    """Alliance vote columns of a booth table, in display order."""
+    return [c for c in table.columns if c not in SUMMARY_COLS]
+
+
+def booth_rows(table, booth_number):
+    """All years for one booth (empty frame if the booth is unknown)."""
+    booth_number = str(booth_number)
+    try:
+        return table.xs(booth_number, level="BoothGroup")
+    except KeyError:
+        return table.iloc[0:0].droplevel("BoothGroup")
+
+
+def booth_trend(rows):
+    """
+    Per-year alliance vote share (%) for one booth, as the multi-year chart
+    shows it: alliances with no votes in any year are dropped, any alliance not
+    in MAIN_ALLIANCES is folded into OTHERS, and OTHERS is always present.
+    """
+    rows = rows[rows["total_votes"] > 0]
+    alliances = table_alliances(rows)
+    shares = rows[alliances].div(rows["total_votes"], axis=0) * 100
+    shares = shares.loc[:, (rows[alliances] > 0).any(axis=0)]
+    minor = [c for c in shares.columns if c not in MAIN_ALLIANCES]
+    trend = shares[[c for c in MAIN_ALLIANCES if c in shares.columns]].copy()
+    trend["OTHERS"] = shares[minor].sum(axis=1)
+    return trend
@@ -0,0 +1,216 @@
+# utils/crosswalk.py
+"""
+Cross-year booth crosswalk, built once per constituency dataset.
+
+Booth numbers are not stable between elections: auxiliary stations appear
+("123(A)" next to "123"), stations are split, and some are renumbered. The
+crosswalk maps each booth, as numbered in the latest election it appears in,
+to the BoothGroup that holds the same place in every other year, with a
+confidence score:
+
+  same          same number, same set of stations (main + auxiliary)    1.0
+  aux split     same number, auxiliary stations added or removed        0.85
+  renumbered    matched by polling-station name to another number       name similarity × 0.9
+  name differs  same number, but the station name no longer matches     0.5
+                (dropped when that station was renumbered to another booth)
+
+Station names come from any name / location / village column a sheet has
+(see booth_index._station_columns); sheets with only "Polling Station No."
+can be matched on numbers and suffixes alone.
+
+Lookups are dict hits, and align() re-keys a whole booth × year table in one
+take(), so the trend and leaderboard join through the crosswalk without
+per-booth searching:
+
+    cw = BoothCrosswalk.from_all_data(all_data)
+    cw.source("123", "2019")    # ("125", 0.72, "renumbered")
+    aligned = cw.align(booth_table)
+"""
+import re
+import sys
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+from utils.booth_index import _station_columns, natural_key, natural_sort
+
+_STATION_RE = re.compile(r"^\s*(\d+)\s*\(?\s*([A-Za-z]?)")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+SAME, AUX_SPLIT, RENUMBERED, NAME_DIFFERS = "same", "aux split", "renumbered", "name differs"
+AUX_SPLIT_CONFIDENCE = 0.85
+NAME_DIFFERS_CONFIDENCE = 0.5
+RENUMBERED_FACTOR = 0.9
+NAME_MATCH = 0.5      # token overlap at which two station names count as the same place
+RENAME_MATCH = 0.6    # ...and at which another booth's name is taken as a renumbering
+
+COLUMNS = ["Booth", "Year", "Source", "Confidence", "Basis"]
+
+
+def station_suffix(label):
+    """Auxiliary suffix of a polling-station label: "12(A)" -> "A", "12" -> "" (None if unnumbered)."""
+    m = _STATION_RE.match(str(label))
+    return m.group(2).upper() if m else None
+
+
+def name_tokens(text):
+    return frozenset(_TOKEN_RE.findall(str(text).lower())) - {"nan"}
+
+
+def similarity(a, b):
+    """Jaccard overlap of two token sets (0 when either is empty)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _year_stations(info):
+    """
+    {booth: (frozenset of station suffixes, name tokens)} for one year. The
+    name is that of the main station when the booth has one.
+    """
+    df = info["data"]
+    booth = df["BoothGroup"].astype(str).to_numpy(dtype=object)
+    cols = _station_columns(df, info.get("polling_col"))
+    polling = info.get("polling_col")
+    labels = df[polling].astype(str).to_numpy(dtype=object) if polling in df.columns else booth
+    name_cols = [c for c in cols if c != polling]
+    names = None
+    if name_cols:
+        text = df[name_cols[0]].astype(str)
+        for c in name_cols[1:]:
+            text = text + " " + df[c].astype(str)
+        names = text.to_numpy(dtype=object)
+
+    suffixes = defaultdict(set)
+    main_name, any_name = {}, {}
+    for i, (b, label) in enumerate(zip(booth, labels)):
+        suffix = station_suffix(label)
+        suffixes[b].add(suffix or "")
+        if names is not None:
+            tokens = name_tokens(names[i])
+            if tokens:
+                any_name.setdefault(b, tokens)
+                if not suffix:
+                    main_name.setdefault(b, tokens)
+    return {b: (frozenset(s), main_name.get(b) or any_name.get(b, frozenset())) for b, s in suffixes.items()}
+
+
+class _NameIndex:
+    """Inverted token index over one year's station names, for renumbering lookups."""
+
+    def __init__(self, stations):
+        self._sizes = {b: len(tokens) for b, (_, tokens) in stations.items() if tokens}
+        self._postings = defaultdict(list)
+        for b, (_, tokens) in stations.items():
+            for t in tokens:
+                self._postings[t].append(b)
+
+    def best(self, tokens):
+        """(booth, similarity) of the closest name, or (None, 0.0); ties go to the lowest booth."""
+        # shared-token counts straight from the postings: Jaccard without set operations
+        shared = Counter(b for t in tokens for b in self._postings.get(t, ()))
+        best, best_sim = None, 0.0
+        for b, n in shared.items():
+            sim = n / (len(tokens) + self._sizes[b] - n)
+            if sim > best_sim or (sim == best_sim and natural_key(b) < natural_key(best)):
+                best, best_sim = b, sim
+        return best, best_sim
+
+
+class BoothCrosswalk:
+    def __init__(self, entries, years):
+        """entries: {booth: {year: (source booth, confidence, basis)}}; years oldest first."""
+        self.entries = entries
+        self.years = list(years)
+        self.booths = natural_sort(entries)
+
+    @classmethod
+    def from_all_data(cls, all_data):
+        years = sorted(all_data, key=int)
+        stations = {y: _year_stations(all_data[y]) for y in years}
+        name_index = {y: _NameIndex(stations[y]) for y in years}
+
+        entries = {}
+        for booth in natural_sort({b for y in years for b in stations[y]}):
+            ref_year = next(y for y in reversed(years) if booth in stations[y])
+            ref_suffixes, ref_name = stations[ref_year][booth]
+            row = {ref_year: (booth, 1.0, SAME)}
+            for year in years:
+                if year == ref_year:
+                    continue
+                match = cls._match(booth, ref_suffixes, ref_name, stations[year], name_index[year])
+                if match is not None:
+                    row[year] = match
+            entries[booth] = dict(sorted(row.items(), key=lambda x: int(x[0])))
+
+        # a station claimed by a renumbering is not also the (renamed) same-number booth
+        claimed = {(y, m[0]) for row in entries.values() for y, m in row.items() if m[2] == RENUMBERED}
+        for row in entries.values():
+            for y in [y for y, m in row.items() if m[2] == NAME_DIFFERS and (y, m[0]) in claimed]:
+                del row[y]
+        return cls(entries, years)
+
+    @staticmethod
+    def _match(booth, ref_suffixes, ref_name, year_stations, year_names):
+        same = year_stations.get(booth)
+        if same is not None:
+            suffixes, name = same
+            if not (ref_name and name) or similarity(ref_name, name) >= NAME_MATCH:
+                return (booth, 1.0, SAME) if suffixes == ref_suffixes else (booth, AUX_SPLIT_CONFIDENCE, AUX_SPLIT)
+        if ref_name:
+            other, sim = year_names.best(ref_name)
+            if other is not None and other != booth and sim >= RENAME_MATCH:
+                return other, round(sim * RENUMBERED_FACTOR, 2), RENUMBERED
+        if same is not None:
+            return booth, NAME_DIFFERS_CONFIDENCE, NAME_DIFFERS
+        return None
+
+    def __len__(self):
+        return len(self.booths)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the mapping (dicts, tuples and booth strings)."""
+        total = sys.getsizeof(self.entries) + sys.getsizeof(self.booths)
+        for booth, row in self.entries.items():
+            total += sys.getsizeof(booth) + sys.getsizeof(row)
+            total += sum(sys.getsizeof(m) + sys.getsizeof(m[0]) for m in row.values())
+        return total
+
+    def source(self, booth, year):
+        """(source BoothGroup, confidence, basis) for booth in year, or None."""
+        return self.entries.get(str(booth), {}).get(str(year))
+
+    def matches(self, booth):
+        """{year: (source, confidence, basis)} for one booth."""
+        return self.entries.get(str(booth), {})
+
+    def min_confidence(self, booths):
+        """Lowest confidence over the years each booth is matched in (NaN if unknown)."""
+        return np.array([
+            min((c for _, c, _ in self.entries[b].values()), default=np.nan) if b in self.entries else np.nan
+            for b in map(str, booths)
+        ], dtype=float)
+
+    def frame(self):
+        """Every mapping as rows: Booth, Year, Source, Confidence, Basis."""
+        rows = [(b, y, src, conf, basis) for b in self.booths for y, (src, conf, basis) in self.entries[b].items()]
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def align(self, table):
+        """
+        Booth × year table re-keyed by crosswalk booth: row (booth, year) holds
+        the table's row for the matched source booth that year. A split source
+        may back more than one booth, so don't sum the result across booths.
+        """
+        cw = self.frame()
+        source = pd.MultiIndex.from_arrays([cw["Source"], cw["Year"]])
+        pos = table.index.get_indexer(source)
+        keep = pos >= 0
+        aligned = table.take(pos[keep])
+        aligned.index = pd.MultiIndex.from_arrays(
+            [cw["Booth"].to_numpy()[keep], cw["Year"].to_numpy()[keep]], names=["BoothGroup", "year"]
+        )
+        return aligned.sort_index()
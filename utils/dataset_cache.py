@@ -0,0 +1,221 @@
+# utils/dataset_cache.py
+"""
+Process-wide cache of parsed constituency datasets.
+
+Streamlit re-executes page scripts per session and per rerun, but imported
+modules live for the whole server process – so a cache held here is shared by
+every session. Entries are evicted least-recently-used once the total
+estimated size passes a memory budget (BOOTH_DATASET_CACHE_MB, default 512).
+
+Cached frames are shared between sessions: callers must treat them as
+read-only.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from utils.booth_index import BoothIndex
+from utils.crosswalk import BoothCrosswalk
+from utils.booth_table import build_booth_table
+from utils.leaderboard import build_leaderboard
+from utils.parse_cache import parse_form20_cached
+from utils.perf import PERF
+
+DEFAULT_BUDGET_MB = float(os.environ.get("BOOTH_DATASET_CACHE_MB", "512"))
+
+
+def _frame_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def estimate_bytes(value):
+    """
+    Rough in-memory size of a cached value: DataFrames by memory_usage, and
+    anything with an nbytes (numpy arrays, BoothIndex, BoothCrosswalk) by
+    that. Other scalars and strings count as 0.
+    """
+    if hasattr(value, "memory_usage"):
+        return _frame_bytes(value)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(estimate_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(v) for v in value)
+    return 0
+
+
+class DatasetCache:
+    """Thread-safe LRU cache bounded by estimated bytes rather than entry count."""
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def total_bytes(self):
+        return sum(n for _, n in self._entries.values())
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        nbytes = estimate_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                del self._entries[key]
+            if nbytes > self.budget_bytes:
+                # a single dataset larger than the budget is served but not kept
+                return
+            self._entries[key] = (value, nbytes)
+            while self.total_bytes > self.budget_bytes and len(self._entries) > 1:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for key, calling loader() on a miss. Concurrent
+        misses on the same key wait for a single load instead of parsing twice.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key][0]
+            value = loader()
+            self.put(key, value)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, match=None):
+        """
+        Drop entries. match=None clears everything; otherwise match is called
+        with each key and entries for which it returns True are removed.
+        Returns the number of entries dropped.
+        """
+        with self._lock:
+            if match is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            doomed = [k for k in self._entries if match(k)]
+            for k in doomed:
+                del self._entries[k]
+            return len(doomed)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+# The shared instance used by the pages.
+DATASET_CACHE = DatasetCache()
+
+
+def _file_signature(file_path):
+    try:
+        st = os.stat(file_path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _load_files(folder_path, file_list):
+    all_data = {}
+    problems = []
+    for year, filename in file_list:
+        file_path = os.path.join(folder_path, filename)
+        if not os.path.exists(file_path):
+            problems.append(f"⚠️ Missing file: {file_path}")
+            continue
+        try:
+            parsed = parse_form20_cached(file_path)
+            all_data[year] = {
+                "data": parsed["data"],
+                "candidates": parsed["candidates"],
+                "polling_col": parsed["polling_col"],
+                "variant": parsed["variant"],
+            }
+        except Exception as e:
+            problems.append(f"⚠️ {file_path} → {e}")
+    years = sorted(all_data, key=int)
+    with PERF.timer("booth_table"):
+        booth_table = build_booth_table(all_data)
+    with PERF.timer("booth_index"):
+        booth_index = BoothIndex.from_all_data(all_data)
+    with PERF.timer("crosswalk"):
+        crosswalk = BoothCrosswalk.from_all_data(all_data)
+        aligned_table = crosswalk.align(booth_table)
+    with PERF.timer("leaderboard"):
+        leaderboard = build_leaderboard(aligned_table, years, crosswalk)
+    return {
+        "all_data": all_data,
+        "problems": problems,
+        "years": years,
+        "booth_table": booth_table,
+        "booths": booth_index.booths,
+        "booth_index": booth_index,
+        "crosswalk": crosswalk,
+        "aligned_table": aligned_table,
+        "leaderboard": leaderboard,
+    }
+
+
+def load_constituency_data(folder_path, file_list, cache=DATASET_CACHE):
+    """
+    Load every (year, filename) in file_list from folder_path through the shared
+    cache. The key includes each file's mtime/size, so an overwritten CSV is a
+    miss and the old entry simply ages out.
+    Returns a dict with:
+      all_data    – {year: {"data", "candidates", "polling_col", "variant"}}
+      problems    – warning strings for missing / unparseable files
+      years       – loaded years, oldest first
+      booth_table – (BoothGroup, year) summary table, see utils/booth_table.py
+      booths      – every BoothGroup, in numeric order
+      booth_index – BoothIndex for booth-number / station-text search
+      crosswalk   – BoothCrosswalk matching booths across years, see utils/crosswalk.py
+      aligned_table – booth_table re-keyed through the crosswalk (per-booth
+                    trends; don't sum it across booths)
+      leaderboard – one summary row per booth, see utils/leaderboard.py
+      key         – the cache key (changes whenever any source file does)
+    """
+    folder_path = os.path.abspath(folder_path)
+    key = (
+        folder_path,
+        tuple((year, filename, _file_signature(os.path.join(folder_path, filename)))
+              for year, filename in file_list),
+    )
+    with PERF.timer("dataset_load", folder=os.path.basename(folder_path)):
+        return cache.get_or_load(key, lambda: {**_load_files(folder_path, file_list), "key": key})
+
+
+def invalidate_constituency(folder_path, cache=DATASET_CACHE):
+    """Drop every cached dataset loaded from folder_path."""
+    folder_path = os.path.abspath(folder_path)
+    return cache.invalidate(lambda key: key[0] == folder_path)
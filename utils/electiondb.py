@@ -0,0 +1,395 @@
+# utils/electiondb.py
+"""
+Embedded SQLite database of every ingested Form-20 sheet.
+
+Normalized schema (votes summed per booth, i.e. per BoothGroup):
+
+    election(id, year, kind)                    kind: MP / MLA
+    constituency(id, district, name, ac_no)
+    booth(id, constituency_id, booth_no, booth_num)
+    party(id, code)
+    candidate(id, election_id, constituency_id, party_id, column_name)
+    votes(booth_id, candidate_id, votes)
+    booth_total(booth_id, election_id, polled_votes, electors)
+    alliance_member(year, party_id, alliance)   from ALLIANCES_BY_YEAR
+    source_file(election_id, constituency_id, path, mtime_ns, size, parser_version)
+
+plus booth_alliance(election_id, alliance, booth_id, votes, share), the
+per-booth alliance totals (NOTA and OTHERS included, share in % of the
+booth's votes, NULL for a booth without votes), rebuilt at the end of every
+build, and the booth_alliance_share view joining it to names.
+
+    python -m utils.electiondb build            # (re)load changed files only
+    python -m utils.electiondb query "SELECT ..."
+
+    from utils.electiondb import query, share_change
+    share_change("DMK+ALLIANCE", "2019", "2024", min_drop=10, district="Ariyalur")
+
+Queries run on a read-only connection.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.alliances import ALLIANCES_BY_YEAR, party_of
+from utils.booth_table import _total_voters_col, _total_votes_col
+from utils.form20 import PARSER_VERSION
+from utils.ingest import discover_constituencies
+from utils.manifest import DATA_DIR, parse_filename
+from utils.parse_cache import DEFAULT_CACHE_DIR, parse_form20_cached
+
+DEFAULT_DB_PATH = os.path.abspath(
+    os.environ.get("BOOTH_DB_PATH", os.path.join(os.path.dirname(DEFAULT_CACHE_DIR), "elections.sqlite"))
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS election (
+    id INTEGER PRIMARY KEY,
+    year TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    UNIQUE (year, kind)
+);
+CREATE TABLE IF NOT EXISTS constituency (
+    id INTEGER PRIMARY KEY,
+    district TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ac_no INTEGER,
+    UNIQUE (district, name)
+);
+CREATE TABLE IF NOT EXISTS booth (
+    id INTEGER PRIMARY KEY,
+    constituency_id INTEGER NOT NULL REFERENCES constituency(id),
+    booth_no TEXT NOT NULL,
+    booth_num INTEGER,
+    UNIQUE (constituency_id, booth_no)
+);
+CREATE TABLE IF NOT EXISTS party (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS candidate (
+    id INTEGER PRIMARY KEY,
+    election_id INTEGER NOT NULL REFERENCES election(id),
+    constituency_id INTEGER NOT NULL REFERENCES constituency(id),
+    party_id INTEGER NOT NULL REFERENCES party(id),
+    column_name TEXT NOT NULL,
+    UNIQUE (election_id, constituency_id, column_name)
+);
+CREATE TABLE IF NOT EXISTS votes (
+    booth_id INTEGER NOT NULL REFERENCES booth(id),
+    candidate_id INTEGER NOT NULL REFERENCES candidate(id),
+    votes INTEGER NOT NULL,
+    PRIMARY KEY (booth_id, candidate_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS booth_total (
+    booth_id INTEGER NOT NULL REFERENCES booth(id),
+    election_id INTEGER NOT NULL REFERENCES election(id),
+    polled_votes INTEGER NOT NULL,
+    electors INTEGER NOT NULL,
+    PRIMARY KEY (booth_id, election_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS alliance_member (
+    year TEXT NOT NULL,
+    party_id INTEGER NOT NULL REFERENCES party(id),
+    alliance TEXT NOT NULL,
+    PRIMARY KEY (year, party_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS source_file (
+    election_id INTEGER NOT NULL REFERENCES election(id),
+    constituency_id INTEGER NOT NULL REFERENCES constituency(id),
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    parser_version INTEGER NOT NULL,
+    PRIMARY KEY (election_id, constituency_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_constituency_district ON constituency(district);
+CREATE INDEX IF NOT EXISTS idx_booth_num ON booth(constituency_id, booth_num);
+CREATE INDEX IF NOT EXISTS idx_candidate_election ON candidate(election_id, constituency_id);
+CREATE INDEX IF NOT EXISTS idx_candidate_party ON candidate(party_id);
+CREATE INDEX IF NOT EXISTS idx_votes_candidate ON votes(candidate_id);
+
+CREATE TABLE IF NOT EXISTS booth_alliance (
+    election_id INTEGER NOT NULL REFERENCES election(id),
+    alliance TEXT NOT NULL,
+    booth_id INTEGER NOT NULL REFERENCES booth(id),
+    votes INTEGER NOT NULL,
+    share REAL,
+    PRIMARY KEY (election_id, alliance, booth_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_booth_alliance_booth ON booth_alliance(booth_id);
+
+CREATE VIEW IF NOT EXISTS booth_alliance_share AS
+SELECT e.year, e.kind, c.district, c.name AS constituency, b.booth_no, b.booth_num,
+       ba.alliance, ba.votes, ba.share
+FROM booth_alliance ba
+JOIN election e ON e.id = ba.election_id
+JOIN booth b ON b.id = ba.booth_id
+JOIN constituency c ON c.id = b.constituency_id;
+"""
+
+
+def connect(db_path=DEFAULT_DB_PATH, read_only=False):
+    """sqlite3 connection; read_only opens the file with mode=ro and query_only on."""
+    if read_only:
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Election database not found: {db_path} (run python -m utils.electiondb build)")
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _id(conn, table, **cols):
+    """Primary key of the row with these column values, inserting it if needed."""
+    where = " AND ".join(f"{k} = ?" for k in cols)
+    row = conn.execute(f"SELECT id FROM {table} WHERE {where}", tuple(cols.values())).fetchone()
+    if row:
+        return row[0]
+    names = ", ".join(cols)
+    marks = ", ".join("?" for _ in cols)
+    return conn.execute(f"INSERT INTO {table} ({names}) VALUES ({marks})", tuple(cols.values())).lastrowid
+
+
+def _sync_alliances(conn, alliances_by_year):
+    conn.execute("DELETE FROM alliance_member")
+    for year, alliances in alliances_by_year.items():
+        for alliance, members in alliances.items():
+            for party in members:
+                conn.execute(
+                    "INSERT OR IGNORE INTO alliance_member (year, party_id, alliance) VALUES (?, ?, ?)",
+                    (str(year), _id(conn, "party", code=party.upper()), alliance),
+                )
+
+
+def _clear_file(conn, election_id, constituency_id):
+    cands = "SELECT id FROM candidate WHERE election_id = ? AND constituency_id = ?"
+    conn.execute(f"DELETE FROM votes WHERE candidate_id IN ({cands})", (election_id, constituency_id))
+    conn.execute("DELETE FROM candidate WHERE election_id = ? AND constituency_id = ?", (election_id, constituency_id))
+    conn.execute(
+        "DELETE FROM booth_total WHERE election_id = ? AND booth_id IN "
+        "(SELECT id FROM booth WHERE constituency_id = ?)", (election_id, constituency_id),
+    )
+    conn.execute("DELETE FROM source_file WHERE election_id = ? AND constituency_id = ?", (election_id, constituency_id))
+
+
+def _drop_orphan_booths(conn, constituency_id):
+    """Delete a constituency's booths no loaded sheet has any more (no booth_total row)."""
+    orphans = ("SELECT id FROM booth WHERE constituency_id = ? AND NOT EXISTS "
+               "(SELECT 1 FROM booth_total bt WHERE bt.booth_id = booth.id)")
+    # booth_alliance is rebuilt after every build; clear its rows now for the foreign key
+    conn.execute(f"DELETE FROM booth_alliance WHERE booth_id IN ({orphans})", (constituency_id,))
+    conn.execute(f"DELETE FROM booth WHERE id IN ({orphans})", (constituency_id,))
+
+
+def load_file(conn, path, district, constituency, year, kind, ac_no, cache_dir=DEFAULT_CACHE_DIR):
+    """Replace one sheet's rows. Returns the number of vote rows written."""
+    parsed = parse_form20_cached(path, cache_dir)
+    df, candidates = parsed["data"], parsed["candidates"]
+    election_id = _id(conn, "election", year=str(year), kind=kind or "")
+    constituency_id = _id(conn, "constituency", district=district, name=constituency)
+    if ac_no is not None:
+        conn.execute("UPDATE constituency SET ac_no = ? WHERE id = ?", (ac_no, constituency_id))
+    _clear_file(conn, election_id, constituency_id)
+
+    booth = df["BoothGroup"].astype(str)
+    cand = df[candidates].astype("int64").groupby(booth, sort=False).sum().clip(lower=0)
+    total_col, voters_col = _total_votes_col(df), _total_voters_col(df)
+    polled = (df[total_col].astype("int64").groupby(booth, sort=False).sum().reindex(cand.index)
+              if total_col else cand.sum(axis=1))
+    electors = (df[voters_col].astype("int64").groupby(booth, sort=False).sum().reindex(cand.index)
+                if voters_col else polled)
+
+    for b in cand.index:
+        conn.execute(
+            "INSERT OR IGNORE INTO booth (constituency_id, booth_no, booth_num) VALUES (?, ?, ?)",
+            (constituency_id, b, int(b) if b.isdigit() else None),
+        )
+    id_of = dict(conn.execute("SELECT booth_no, id FROM booth WHERE constituency_id = ?", (constituency_id,)))
+    booth_ids = np.array([id_of[b] for b in cand.index], dtype=np.int64)
+
+    cand_ids = []
+    for col in candidates:
+        party_id = _id(conn, "party", code=party_of(col))
+        cand_ids.append(conn.execute(
+            "INSERT INTO candidate (election_id, constituency_id, party_id, column_name) VALUES (?, ?, ?, ?)",
+            (election_id, constituency_id, party_id, col),
+        ).lastrowid)
+
+    mat = cand.to_numpy(dtype=np.int64)
+    rows = [
+        (int(booth_ids[i]), int(cand_ids[j]), int(mat[i, j]))
+        for i in range(mat.shape[0]) for j in range(mat.shape[1])
+    ]
+    conn.executemany("INSERT INTO votes (booth_id, candidate_id, votes) VALUES (?, ?, ?)", rows)
+    conn.executemany(
+        "INSERT INTO booth_total (booth_id, election_id, polled_votes, electors) VALUES (?, ?, ?, ?)",
+        [(int(b), election_id, int(p), int(v))
+         for b, p, v in zip(booth_ids, polled.fillna(0).to_numpy(), electors.fillna(0).to_numpy())],
+    )
+    st = os.stat(path)
+    conn.execute(
+        "INSERT INTO source_file (election_id, constituency_id, path, mtime_ns, size, parser_version) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (election_id, constituency_id, os.path.abspath(path), st.st_mtime_ns, st.st_size, PARSER_VERSION),
+    )
+    # a re-issued sheet may have dropped or renumbered booths
+    _drop_orphan_booths(conn, constituency_id)
+    return len(rows)
+
+
+def refresh_alliance_votes(conn):
+    """Recompute booth_alliance from votes and alliance_member."""
+    conn.execute("DELETE FROM booth_alliance")
+    conn.execute("""
+        INSERT INTO booth_alliance (election_id, alliance, booth_id, votes, share)
+        SELECT election_id, bucket, booth_id, votes,
+               CASE WHEN SUM(votes) OVER w > 0 THEN votes * 100.0 / SUM(votes) OVER w END
+        FROM (
+            SELECT ca.election_id, v.booth_id,
+                   COALESCE(am.alliance, CASE WHEN p.code = 'NOTA' THEN 'NOTA' ELSE 'OTHERS' END) AS bucket,
+                   SUM(v.votes) AS votes
+            FROM votes v
+            JOIN candidate ca ON ca.id = v.candidate_id
+            JOIN party p ON p.id = ca.party_id
+            JOIN election e ON e.id = ca.election_id
+            LEFT JOIN alliance_member am ON am.year = e.year AND am.party_id = p.id
+            -- not "alliance": in GROUP BY that name resolves to am.alliance, folding NOTA into OTHERS
+            GROUP BY ca.election_id, v.booth_id, bucket
+        )
+        WINDOW w AS (PARTITION BY election_id, booth_id)
+    """)
+
+
+def _is_current(conn, path):
+    st = os.stat(path)
+    row = conn.execute(
+        "SELECT 1 FROM source_file WHERE path = ? AND mtime_ns = ? AND size = ? AND parser_version = ?",
+        (os.path.abspath(path), st.st_mtime_ns, st.st_size, PARSER_VERSION),
+    ).fetchone()
+    return row is not None
+
+
+def build(data_dir=DATA_DIR, db_path=DEFAULT_DB_PATH, cache_dir=DEFAULT_CACHE_DIR, force=False, progress=None):
+    """
+    Load every sheet under data_dir, skipping files whose mtime/size/parser
+    version already match the database. Returns a summary dict.
+    """
+    started = time.perf_counter()
+    summary = {"loaded": 0, "skipped": 0, "removed": 0, "vote_rows": 0, "errors": []}
+    conn = connect(db_path)
+    try:
+        with conn:
+            _sync_alliances(conn, ALLIANCES_BY_YEAR)
+        targets = discover_constituencies(data_dir)
+        wanted = {
+            os.path.abspath(os.path.join(data_dir, d, c, f)) for (d, c), files in targets.items() for _, f in files
+        }
+        with conn:
+            for election_id, constituency_id, path in conn.execute(
+                "SELECT election_id, constituency_id, path FROM source_file"
+            ).fetchall():
+                if path not in wanted:
+                    _clear_file(conn, election_id, constituency_id)
+                    _drop_orphan_booths(conn, constituency_id)
+                    summary["removed"] += 1
+        for (district, constituency), files in sorted(targets.items()):
+            for year, filename in files:
+                path = os.path.join(data_dir, district, constituency, filename)
+                if not force and _is_current(conn, path):
+                    summary["skipped"] += 1
+                    continue
+                _, ac_no, kind = parse_filename(filename)
+                try:
+                    with conn:
+                        summary["vote_rows"] += load_file(conn, path, district, constituency, year, kind, ac_no, cache_dir)
+                    summary["loaded"] += 1
+                except Exception as e:
+                    summary["errors"].append(f"{district}/{constituency}/{filename}: {e}")
+                if progress:
+                    progress(district, constituency, filename)
+        with conn:
+            refresh_alliance_votes(conn)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def query(sql, params=(), db_path=DEFAULT_DB_PATH):
+    """Run a read-only query and return a DataFrame."""
+    conn = connect(db_path, read_only=True)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def share_change(alliance, from_year, to_year, min_drop=None, district=None, db_path=DEFAULT_DB_PATH):
+    """
+    Booths with the alliance's share in both years and the change in points
+    (to_year − from_year), biggest drop first. min_drop keeps only booths that
+    fell by at least that many points; district narrows to one district.
+    """
+    sql = """
+        SELECT a.district, a.constituency, a.booth_no,
+               ROUND(a.share, 2) AS share_from, ROUND(b.share, 2) AS share_to,
+               ROUND(b.share - a.share, 2) AS change
+        FROM booth_alliance_share a
+        JOIN booth_alliance_share b
+          ON b.district = a.district AND b.constituency = a.constituency
+         AND b.booth_no = a.booth_no AND b.alliance = a.alliance
+        WHERE a.alliance = ? AND a.year = ? AND b.year = ?
+          AND a.share IS NOT NULL AND b.share IS NOT NULL
+    """
+    params = [alliance, str(from_year), str(to_year)]
+    if district:
+        sql += " AND a.district = ?"
+        params.append(district)
+    if min_drop is not None:
+        sql += " AND a.share - b.share >= ?"
+        params.append(float(min_drop))
+    sql += " ORDER BY change, a.district, a.constituency, a.booth_num"
+    return query(sql, params, db_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the embedded election database.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="load changed Form-20 files into the database")
+    b.add_argument("--data-dir", default=DATA_DIR)
+    b.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    b.add_argument("--db", default=DEFAULT_DB_PATH)
+    b.add_argument("--force", action="store_true", help="reload every file")
+    q = sub.add_parser("query", help="run a read-only SQL query")
+    q.add_argument("sql")
+    q.add_argument("--db", default=DEFAULT_DB_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        summary = build(os.path.abspath(args.data_dir), args.db, args.cache_dir, args.force,
+                        progress=lambda d, c, f: print(f"{d} / {c} / {f}", file=sys.stderr))
+        print(f"Loaded {summary['loaded']} files ({summary['vote_rows']} vote rows), "
+              f"skipped {summary['skipped']} unchanged, removed {summary['removed']}, in {summary['seconds']:.1f}s → {args.db}")
+        for err in summary["errors"]:
+            print(f"  ❌ {err}")
+        return 1 if summary["errors"] else 0
+
+    print(query(args.sql, db_path=args.db).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+# utils/export.py
+"""
+Bulk constituency report export.
+
+Writes, for every booth of a constituency:
+
+  booth_years.csv  one row per booth and year (alliance votes, winner, margin,
+                   turnout), the per-booth summary columns alongside
+  leaderboard.csv  the constituency leaderboard
+  booklet.html     a printable booklet: one section per booth with the
+                   yearly summary and static SVG share bars (no JS, no
+                   image renderer needed)
+  report.zip       all of the above
+
+Jobs run on a small process-wide thread pool so the requesting session keeps
+working; they stream booth by booth to disk, so memory stays flat however
+many booths there are. Pages poll job.progress.
+
+Each job belongs to the session that started it (owner): get_job only hands
+a job back to that owner, so one session can't see or cancel another's.
+Finished jobs are kept for EXPORT_TTL_S (env BOOTH_EXPORT_TTL_S, default one
+hour) and at most MAX_FINISHED_JOBS of them; older ones are dropped together
+with their output folder, as are folders left in the export directory by an
+earlier server process.
+
+    job = start_export("Ariyalur", "Jayankondam", owner=session_id)
+    job.status, job.done, job.total, job.paths
+"""
+import csv
+import html
+import itertools
+import os
+import shutil
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.alliances import alliance_colors
+from utils.analytics import booth_report, load_dataset
+from utils.booth_table import table_alliances
+from utils.manifest import DATA_DIR
+from utils.parse_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_EXPORT_DIR = os.path.abspath(
+    os.environ.get("BOOTH_EXPORT_DIR", os.path.join(os.path.dirname(DEFAULT_CACHE_DIR), "exports"))
+)
+EXPORT_WORKERS = 2
+EXPORT_TTL_S = float(os.environ.get("BOOTH_EXPORT_TTL_S", "3600"))
+MAX_FINISHED_JOBS = 32
+
+_BOOKLET_HEAD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; }}
+section {{ page-break-inside: avoid; border-top: 1px solid #ccc; padding: 8px 0; }}
+table {{ border-collapse: collapse; font-size: 13px; margin: 4px 0; }}
+td, th {{ border: 1px solid #ddd; padding: 2px 6px; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+.summary {{ font-size: 13px; color: #333; }}
+</style></head><body>
+<h1>{title}</h1>
+<p>{booths} booths · elections {years} · generated {generated}</p>
+"""
+
+
+def _svg_bars(alliance_votes, width=420, bar=14):
+    """Horizontal share bars for one booth-year as inline SVG."""
+    total = sum(alliance_votes.values()) or 1
+    rows = []
+    for i, (alliance, votes) in enumerate(alliance_votes.items()):
+        share = votes / total
+        y = i * (bar + 4)
+        rows.append(
+            f'<rect x="150" y="{y}" width="{share * (width - 210):.1f}" height="{bar}" '
+            f'fill="{alliance_colors.get(alliance, "#cccccc")}"/>'
+            f'<text x="0" y="{y + bar - 3}" font-size="11">{html.escape(alliance)}</text>'
+            f'<text x="{155 + share * (width - 210):.1f}" y="{y + bar - 3}" font-size="11">{share * 100:.1f}%</text>'
+        )
+    height = max(len(rows), 1) * (bar + 4)
+    return f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">{"".join(rows)}</svg>'
+
+
+def _booth_section(report):
+    parts = [f"<section><h2>Booth {html.escape(report.booth)}</h2>"]
+    for res in report.years:
+        parts.append(
+            f"<h3>{res.year}</h3><div class='summary'>Winner <b>{html.escape(str(res.winner))}</b> · "
+            f"margin {res.margin_votes:,} votes ({res.margin_pct:.2f}%) · polled {res.polled_votes:,} · "
+            f"turnout {res.turnout_pct:.1f}%</div>{_svg_bars(res.alliance_votes)}"
+        )
+    for year, reason in report.missing:
+        parts.append(f"<p class='summary'>{year}: {'no data' if reason == 'no_data' else 'no votes'}</p>")
+    if report.summary is not None:
+        s = report.summary
+        parts.append(
+            f"<p class='summary'>Dominant <b>{html.escape(s.dominant)}</b> · average share {s.avg_share:.1f}% · "
+            f"volatility {s.volatility:.2f}% · polarization {s.polarization:.1f}% · {html.escape(s.strength)}</p>"
+        )
+    parts.append("</section>\n")
+    return "".join(parts)
+
+
+class ExportJob:
+    _ids = itertools.count(1)
+
+    def __init__(self, district, constituency, out_dir=DEFAULT_EXPORT_DIR, data_dir=DATA_DIR, owner=None):
+        self.id = next(self._ids)
+        self.owner = owner
+        self.district = district
+        self.constituency = constituency
+        self.data_dir = data_dir
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.out_dir = os.path.join(out_dir, f"{district}_{constituency}_{stamp}_{self.id}")
+        self.status = "queued"           # queued / running / done / failed / cancelled
+        self.done = 0
+        self.total = 0
+        self.paths = {}
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        self.status, self.started = "running", time.time()
+        try:
+            self._write()
+            self.status = "cancelled" if self._cancel.is_set() else "done"
+        except Exception as e:
+            self.status, self.error = "failed", str(e)
+        self.finished = time.time()
+        return self
+
+    def _write(self):
+        dataset = load_dataset(self.district, self.constituency, self.data_dir)
+        table = dataset["booth_table"]
+        alliances = table_alliances(table)
+        booths = dataset["booth_index"].booths
+        self.total = len(booths)
+        os.makedirs(self.out_dir, exist_ok=True)
+        paths = {
+            "booth_years.csv": os.path.join(self.out_dir, "booth_years.csv"),
+            "leaderboard.csv": os.path.join(self.out_dir, "leaderboard.csv"),
+            "booklet.html": os.path.join(self.out_dir, "booklet.html"),
+        }
+        dataset["leaderboard"].to_csv(paths["leaderboard.csv"], index=False)
+
+        title = f"{self.constituency} ({self.district}) – booth report"
+        with open(paths["booth_years.csv"], "w", newline="", encoding="utf-8") as csv_f, \
+                open(paths["booklet.html"], "w", encoding="utf-8") as html_f:
+            writer = csv.writer(csv_f)
+            writer.writerow(["Booth", "Year", *alliances, "Polled Votes", "Electors", "Turnout %",
+                             "Winner", "Runner-up", "Margin Votes", "Margin %",
+                             "Dominant Alliance", "Avg Share %", "Strength"])
+            html_f.write(_BOOKLET_HEAD.format(
+                title=html.escape(title), booths=len(booths), years=", ".join(dataset["years"]),
+                generated=time.strftime("%Y-%m-%d %H:%M"),
+            ))
+            for booth in booths:
+                if self._cancel.is_set():
+                    return
+                report = booth_report(dataset, booth)
+                s = report.summary
+                for res in report.years:
+                    writer.writerow([
+                        booth, res.year, *(res.alliance_votes.get(a, 0) for a in alliances),
+                        res.polled_votes, res.total_voters, res.turnout_pct, res.winner, res.runner_up,
+                        res.margin_votes, res.margin_pct,
+                        s.dominant if s else "", round(s.avg_share, 1) if s else "", s.strength if s else "",
+                    ])
+                html_f.write(_booth_section(report))
+                self.done += 1
+            html_f.write("</body></html>\n")
+
+        paths["report.zip"] = os.path.join(self.out_dir, "report.zip")
+        with zipfile.ZipFile(paths["report.zip"], "w", zipfile.ZIP_DEFLATED) as z:
+            for name, path in paths.items():
+                if name != "report.zip":
+                    z.write(path, arcname=name)
+        self.paths = paths
+
+
+_pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _prune(out_dir, now=None):
+    """
+    Forget finished jobs past EXPORT_TTL_S or beyond MAX_FINISHED_JOBS, and
+    delete their folders plus any stale folder in out_dir no job knows about.
+    Call with _jobs_lock held.
+    """
+    now = time.time() if now is None else now
+    finished = sorted((j for j in _jobs.values() if not j.active), key=lambda j: j.finished or 0)
+    expired = [j for j in finished if now - (j.finished or 0) > EXPORT_TTL_S]
+    expired += [j for j in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)] if j not in expired]
+    for job in expired:
+        del _jobs[job.id]
+        shutil.rmtree(job.out_dir, ignore_errors=True)
+
+    known = {os.path.abspath(j.out_dir) for j in _jobs.values()}
+    try:
+        entries = list(os.scandir(out_dir))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            stale = entry.is_dir() and now - entry.stat().st_mtime > EXPORT_TTL_S
+        except OSError:
+            continue
+        if stale and os.path.abspath(entry.path) not in known:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def start_export(district, constituency, out_dir=DEFAULT_EXPORT_DIR, data_dir=DATA_DIR, owner=None):
+    """Queue an export (or return owner's export already running for this constituency)."""
+    with _jobs_lock:
+        _prune(out_dir)
+        for job in _jobs.values():
+            if job.active and job.owner == owner and (job.district, job.constituency) == (district, constituency):
+                return job
+        job = ExportJob(district, constituency, out_dir, data_dir, owner)
+        _jobs[job.id] = job
+    _pool.submit(job.run)
+    return job
+
+
+def get_job(job_id, owner=None):
+    """The job with this id if owner started it, else None (also once it has expired)."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return job if job is not None and job.owner == owner else None
@@ -0,0 +1,235 @@
+# utils/figures.py
+"""
+Plotly figures for the Booth Analysis page, built once and cached.
+
+Building a go.Figure validates every property and is the slowest part of
+showing a booth. Figures are therefore kept, serialized, in a process-wide
+cache keyed on
+
+    (dataset key, booth(s), year, kind, alliance config)
+
+so any session looking at the same booth reuses the spec instead of
+rebuilding it. The dataset key changes whenever a source file does and the
+alliance config key whenever ALLIANCES_BY_YEAR does, so a cached figure is
+never stale; old entries just age out (least recently used first, bounded by
+BOOTH_FIGURE_CACHE_MB, default 64).
+
+Figures carry no plotly template (template="none"): st.plotly_chart applies
+the Streamlit theme in the browser anyway, and plotly's default template is
+about 7 KB of every spec sent.
+
+    fig = pie_figure(dataset, report, report.years[0])
+    fig = comparison_figure(dataset, ["12", "13", "14"])   # small multiples
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from utils.alliances import ALLIANCES_BY_YEAR, MAIN_ALLIANCES, alliance_colors
+from utils.booth_table import table_alliances
+from utils.perf import PERF, hit_rate
+
+DEFAULT_BUDGET_MB = float(os.environ.get("BOOTH_FIGURE_CACHE_MB", "64"))
+MAX_COMPARE_BOOTHS = 24
+COMPARE_COLUMNS = 4
+
+
+def alliance_config_key(alliances_by_year=None):
+    """Short hash of the alliance configuration the figures were built with."""
+    config = ALLIANCES_BY_YEAR if alliances_by_year is None else alliances_by_year
+    blob = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.sha1(blob).hexdigest()[:12]
+
+
+class FigureCache:
+    """Thread-safe LRU of serialized figure specs, bounded by their total size."""
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries = OrderedDict()  # key -> JSON spec
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, builder, stage="figure_build", **fields):
+        """go.Figure for key, built by builder() (and cached) on a miss."""
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if spec is None:
+            with PERF.timer(stage, **fields):
+                spec = builder().to_json(validate=False)
+            self.put(key, spec)
+        # the spec came from a validated figure: skip re-validating it
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def put(self, key, spec):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            if len(spec) > self.budget_bytes:
+                return
+            self._entries[key] = spec
+            self._bytes += len(spec)
+            while self._bytes > self.budget_bytes and len(self._entries) > 1:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped)
+
+    def invalidate(self, match=None):
+        """Drop all entries, or those whose key match(key) is true. Returns the count."""
+        with self._lock:
+            doomed = list(self._entries) if match is None else [k for k in self._entries if match(k)]
+            for k in doomed:
+                self._bytes -= len(self._entries.pop(k))
+            return len(doomed)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes,
+                    "budget_bytes": self.budget_bytes, **hit_rate(self.hits, self.misses)}
+
+
+# The shared instance used by the pages.
+FIGURE_CACHE = FigureCache()
+
+
+def invalidate_figures(folder_path=None, cache=FIGURE_CACHE):
+    """Drop cached figures (all, or only those built from folder_path's dataset)."""
+    folder_path = folder_path and os.path.abspath(folder_path)
+    return cache.invalidate(None if folder_path is None else
+                            lambda k: k[0] is not None and k[0][0] == folder_path)
+
+
+# ---------------------------------------------------------------
+# Builders (uncached)
+# ---------------------------------------------------------------
+def build_pie(booth, res):
+    """Alliance vote pie for one booth-year (a YearResult)."""
+    labels = list(res.alliance_votes)
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=labels,
+                values=list(res.alliance_votes.values()),
+                hole=0.35,
+                marker=dict(colors=[alliance_colors.get(a, "#cccccc") for a in labels],
+                            line=dict(color="white", width=2)),
+                texttemplate="%{label}<br>%{percent:.1%} (%{value:,} votes)",
+                textposition="outside",
+            )
+        ]
+    )
+    fig.update_layout(title=dict(text=f"<b>{res.year} Election – Booth {booth}</b>", x=0.5), template="none")
+    return fig
+
+
+def build_trend(booth, trend):
+    """Grouped multi-year share bars for one booth (a BoothReport.trend)."""
+    fig = go.Figure()
+    for alliance in trend.columns:
+        fig.add_trace(
+            go.Bar(
+                x=trend.index,
+                y=trend[alliance],
+                name=alliance,
+                marker_color=alliance_colors.get(alliance, "#cccccc"),
+                text=[f"{v:.1f}%" for v in trend[alliance]],
+                textposition="outside",
+            )
+        )
+    fig.update_layout(title=dict(text=f"<b>📊 Multi-Year Comparison (2019–2024) – Booth {booth}</b>", x=0.5),
+                      barmode="group", xaxis_title="Election Year", yaxis_title="Vote Share (%)",
+                      template="none")
+    return fig
+
+
+def comparison_shares(table, booths):
+    """
+    Vote share (%) per (booth, year) for the given booths, straight from a booth
+    table: majors that have votes in any of these booths, everything else
+    folded into OTHERS (as booth_trend does for one booth).
+    """
+    booths = [str(b) for b in booths]
+    rows = table[table.index.get_level_values("BoothGroup").isin(booths) & (table["total_votes"] > 0)]
+    alliances = table_alliances(rows)
+    shares = rows[alliances].div(rows["total_votes"], axis=0) * 100
+    shares = shares.loc[:, (rows[alliances] > 0).any(axis=0)]
+    majors = [a for a in MAIN_ALLIANCES if a in shares.columns]
+    out = shares[majors].copy()
+    out["OTHERS"] = shares[[c for c in shares.columns if c not in MAIN_ALLIANCES]].sum(axis=1)
+    return out
+
+
+def build_small_multiples(table, booths, years):
+    """
+    One faceted figure: a grouped multi-year share chart per booth, shared
+    y-axis and one legend, instead of a figure per booth.
+    """
+    booths = [str(b) for b in booths]
+    shares = comparison_shares(table, booths)
+    cols = min(COMPARE_COLUMNS, max(len(booths), 1))
+    n_rows = max(math.ceil(len(booths) / cols), 1)
+    fig = make_subplots(rows=n_rows, cols=cols, shared_yaxes=True,
+                        subplot_titles=[f"Booth {b}" for b in booths],
+                        vertical_spacing=min(0.12, 0.6 / n_rows), horizontal_spacing=0.03)
+    years = [str(y) for y in years]
+    by_booth = {b: shares.xs(b, level="BoothGroup") for b in shares.index.get_level_values("BoothGroup").unique()}
+    traces, rows, cols_ = [], [], []
+    for alliance in shares.columns:
+        first = True
+        for i, booth in enumerate(booths):
+            s = by_booth.get(booth)
+            if s is None:
+                continue
+            y = s[alliance].reindex(years).to_numpy()
+            traces.append(go.Bar(
+                x=years, y=np.round(y, 1), name=alliance, legendgroup=alliance, showlegend=first,
+                marker_color=alliance_colors.get(alliance, "#cccccc"),
+                hovertemplate=f"Booth {booth} · {alliance}<br>%{{x}}: %{{y:.1f}}%<extra></extra>",
+            ))
+            rows.append(i // cols + 1)
+            cols_.append(i % cols + 1)
+            first = False
+    if traces:
+        fig.add_traces(traces, rows=rows, cols=cols_)  # one call: add_trace per bar is much slower
+    fig.update_layout(barmode="group", height=max(260 * n_rows, 320), template="none",
+                      title=dict(text=f"<b>📊 Vote share by election – {len(booths)} booths</b>", x=0.5),
+                      margin=dict(t=80), legend=dict(orientation="h", y=-0.08 / n_rows))
+    fig.update_yaxes(range=[0, 100], ticksuffix="%")
+    fig.update_xaxes(type="category")
+    return fig
+
+
+# ---------------------------------------------------------------
+# Cached figures for a loaded dataset
+# ---------------------------------------------------------------
+def pie_figure(dataset, report, res, cache=FIGURE_CACHE):
+    key = (dataset.get("key"), report.booth, res.year, "pie", alliance_config_key())
+    return cache.get_or_build(key, lambda: build_pie(report.booth, res), chart="pie")
+
+
+def trend_figure(dataset, report, cache=FIGURE_CACHE):
+    key = (dataset.get("key"), report.booth, None, "trend", alliance_config_key())
+    return cache.get_or_build(key, lambda: build_trend(report.booth, report.trend), chart="bar")
+
+
+def comparison_figure(dataset, booths, cache=FIGURE_CACHE):
+    """Small multiples for up to MAX_COMPARE_BOOTHS booths, through the crosswalk-aligned table."""
+    booths = tuple(str(b) for b in booths[:MAX_COMPARE_BOOTHS])
+    table = dataset.get("aligned_table", dataset["booth_table"])
+    key = (dataset.get("key"), booths, None, "multiples", alliance_config_key())
+    return cache.get_or_build(key, lambda: build_small_multiples(table, booths, dataset["years"]),
+                              chart="multiples", booths=len(booths))
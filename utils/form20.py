@@ -0,0 +1,291 @@
+# utils/form20.py
+"""Form-20 (final result sheet) CSV parsing shared by the dashboard pages."""
+import csv
+import io
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever the cleaned output of load_clean_csv changes shape or meaning;
+# the on-disk parse cache (utils/parse_cache.py) is keyed on it.
+PARSER_VERSION = 4
+
+# polling-station name / place columns some sheets carry; kept as text when
+# their cells are mostly words (a candidate called "...NAME..." holds votes)
+_TEXT_COL_RE = re.compile(r"\b(NAME|LOCATION|VILLAGE|ADDRESS)\b", re.IGNORECASE)
+_LETTER_RE = re.compile(r"[A-Za-z]")
+
+# how much of the file the sniffer looks at for delimiter / header / party rows
+SNIFF_ROWS = 30
+
+
+def _iter_lines(text, state):
+    """Yield physical lines of text, recording in state["pos"] how far we got."""
+    pos = 0
+    n = len(text)
+    while pos < n:
+        end = text.find("\n", pos)
+        end = n if end == -1 else end + 1
+        state["pos"] = end
+        yield text[pos:end]
+        pos = end
+
+
+def _sniff_rows(text, sep, limit=SNIFF_ROWS):
+    """First `limit` non-blank rows plus the character offset just past them."""
+    state = {"pos": 0}
+    rows, ends = [], []
+    for row in csv.reader(_iter_lines(text, state), delimiter=sep):
+        if not row:
+            continue  # blank line (read_csv skips these too)
+        rows.append(row)
+        ends.append(state["pos"])
+        if len(rows) >= limit:
+            break
+    return rows, ends
+
+
+def sniff_separator(text):
+    """Tab if tab-splitting the preamble yields more fields than comma-splitting."""
+    sample = text[:8192]
+    widths = {}
+    for sep in (",", "\t"):
+        try:
+            rows, _ = _sniff_rows(sample, sep, limit=10)
+        except csv.Error:
+            rows = []
+        widths[sep] = max((len(r) for r in rows), default=0)
+    return "\t" if widths["\t"] > widths[","] else ","
+
+
+def auto_detect_separator(file_path):
+    try:
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            return sniff_separator(f.read(8192))
+    except Exception:
+        return ","
+
+
+def _is_header(row):
+    row_text = " ".join(str(c) for c in row).upper()
+    return (("SL. NO" in row_text) or ("SL NO" in row_text) or ("SL." in row_text)) and ("POLL" in row_text)
+
+
+def detect_variant(sep, rows, header_row):
+    """
+    Name the Form-20 layout:
+      party-row    – candidate names in the header, a PARTY row below it (2021, 2024)
+      party-header – party codes in the header, candidate names in the row above
+                     and a zero/blank spacer row below (2019)
+      plain        – header followed directly by data
+    prefixed with the delimiter ("csv" / "tsv").
+    """
+    kind = "tsv" if sep == "\t" else "csv"
+    below = rows[header_row + 1] if header_row + 1 < len(rows) else []
+    if below and below[0].strip().upper() == "PARTY":
+        layout = "party-row"
+    elif below and all(c.strip() in ("", "0") for c in below):
+        layout = "party-header"
+    else:
+        layout = "plain"
+    return f"{kind}/{layout}"
+
+
+def _to_int_array(values):
+    """
+    Vote cells → int64. Blank cells are 0, plain integers take the fast path;
+    anything else is cleaned like the original loader did (drop commas/spaces,
+    "nan"/junk → 0).
+    """
+    s = pd.Series(values, dtype=object).fillna("")
+    filled = (s != "").to_numpy()
+    out = np.zeros(len(s), dtype=np.int64)
+    if not filled.any():
+        return out
+    s = s[filled]
+    num = pd.to_numeric(s, errors="coerce")
+    bad = num.isna()
+    if bad.any():
+        raw = s[bad].astype(str)
+        raw = raw.str.replace(",", "", regex=False).str.replace(" ", "", regex=False)
+        raw = raw.where(raw.str.strip() != "", "0").replace("nan", "0")
+        num[bad] = pd.to_numeric(raw, errors="coerce")
+    out[filled] = num.fillna(0).to_numpy(dtype=np.int64)
+    return out
+
+
+def compact_ints(values):
+    """Smallest integer dtype that holds values (unsigned when nothing is negative)."""
+    if len(values) == 0:
+        return values.astype(np.uint16)
+    lo, hi = values.min(), values.max()
+    if lo >= 0:
+        for dtype in (np.uint16, np.uint32):
+            if hi <= np.iinfo(dtype).max:
+                return values.astype(dtype)
+        return values
+    for dtype in (np.int16, np.int32):
+        if np.iinfo(dtype).min <= lo and hi <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values
+
+
+def memory_report(df):
+    """
+    Bytes held by a cleaned frame, per booth, next to what the same data takes
+    with int64 vote columns and object-dtype text columns (the pre-compaction
+    layout). The baseline casts with astype(object) rather than astype(str):
+    from pandas 3 astype(str) gives the pyarrow-backed string dtype, which is
+    already compact and would understate the saving; actual bytes for text
+    columns likewise depend on the pandas version's default string dtype.
+    """
+    booths = max(int(df["BoothGroup"].nunique()), 1)
+    actual = int(df.memory_usage(deep=True).sum())
+    wide = 0
+    for c in df.columns:
+        col = df[c]
+        if pd.api.types.is_integer_dtype(col.dtype):
+            wide += len(col) * 8
+        else:
+            wide += int(col.astype(object).memory_usage(deep=True, index=False))
+    return {
+        "bytes": actual,
+        "bytes_per_booth": round(actual / booths, 1),
+        "int64_bytes_per_booth": round(wide / booths, 1),
+    }
+
+
+def _is_text(column):
+    """More than half of the non-empty cells contain a letter."""
+    cells = [str(v).strip() for v in column.dropna()]
+    cells = [v for v in cells if v]
+    return bool(cells) and sum(bool(_LETTER_RE.search(v)) for v in cells) * 2 > len(cells)
+
+
+def parse_form20(file_path):
+    """
+    Single-pass Form-20 parser.
+
+    The file is read from disk once. The delimiter, header row and party row are
+    sniffed from the first SNIFF_ROWS rows; the body is then tokenised once by
+    the C CSV reader and vote columns are converted straight to the smallest
+    integer dtype that fits (usually uint16). BoothGroup is categorical.
+
+    Returns a dict:
+      data, candidates, polling_col – as load_clean_csv
+      variant   – detected layout, see detect_variant
+      sep       – delimiter used
+      header_row / party_row – indices among the non-blank rows (party_row None if absent)
+    """
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        text = f.read()
+
+    sep = sniff_separator(text)
+    rows, ends = _sniff_rows(text, sep)
+
+    # detect header row (more tolerant)
+    header_row = next((i for i, r in enumerate(rows) if _is_header(r)), None)
+    if header_row is None:
+        raise ValueError(f"Header not found in {file_path}")
+    candidate_row = header_row + 1
+    variant = detect_variant(sep, rows, header_row)
+
+    # body: everything after the candidate/party row, tokenised once
+    body_start = ends[candidate_row] if candidate_row < len(ends) else len(text)
+    width = max(len(r) for r in rows)
+    body = pd.read_csv(
+        io.StringIO(text[body_start:]), sep=sep, header=None, dtype=str,
+        keep_default_na=False, names=range(width), index_col=False,
+    ) if text[body_start:].strip() else pd.DataFrame(columns=range(width), dtype=str)
+    width = max(width, body.shape[1])
+
+    # build column names from header & candidate name row
+    header = rows[header_row] + [""] * (width - len(rows[header_row]))
+    cand_row = rows[candidate_row] if candidate_row < len(rows) else []
+    cand_row = cand_row + [""] * (width - len(cand_row))
+    cols = []
+    for j in range(width):
+        hdr = str(header[j]).strip()
+        cand = str(cand_row[j]).strip()
+        if j < 2:
+            cols.append(hdr or cand or f"col_{j}")
+        else:
+            # prefer candidate name if it's non-numeric (usual case)
+            cols.append(cand if (cand and not cand.isdigit()) else (hdr or cand or f"col_{j}"))
+
+    # make column names unique to prevent df['name'] returning DataFrame if duplicates exist
+    counts = defaultdict(int)
+    uniq_cols = []
+    for c in cols:
+        counts[c] += 1
+        uniq_cols.append(f"{c}__dup{counts[c]-1}" if counts[c] > 1 else c)
+
+    # drop empty / SL. NO blanks
+    if "SL. NO." in uniq_cols:
+        sl = body[uniq_cols.index("SL. NO.")].fillna("nan").astype(str)
+        body = body[sl.str.strip() != ""].reset_index(drop=True)
+
+    # find a polling column (first match)
+    polling_col = next((c for c in uniq_cols if "polling" in c.lower()), None)
+
+    # station name / place columns stay text
+    text_cols = [c for j, c in enumerate(uniq_cols) if _TEXT_COL_RE.search(c) and _is_text(body[j])]
+
+    # numeric columns detection: everything except SL. NO., polling and text columns
+    numeric_cols = [c for c in uniq_cols if c not in ["SL. NO.", polling_col, *text_cols]]
+
+    columns = {}
+    for j, c in enumerate(uniq_cols):
+        raw = body[j].to_numpy(dtype=object)
+        if c in numeric_cols:
+            values = _to_int_array(raw)
+            if c == f"col_{j}" and not values.any():
+                continue  # unnamed padding column, empty in every row
+            columns[c] = compact_ints(values)
+        else:
+            columns[c] = pd.Series(raw, dtype=object).fillna("nan").astype(str)
+    del body  # drop the string-typed body before building derived columns
+    numeric_cols = [c for c in numeric_cols if c in columns]
+    df = pd.DataFrame(columns, columns=[c for c in uniq_cols if c in columns])
+
+    # extract booth number (numeric prefix if present, otherwise whole string)
+    if polling_col is not None:
+        ser = df[polling_col].astype(str)
+        extracted = ser.str.extract(r"(\d+)", expand=False)
+        booth = extracted.fillna(ser)
+    else:
+        # fallback: use row index as booth
+        booth = pd.Series((df.index + 1).astype(str))
+    # categorical: one small integer code per row instead of a string object
+    df["BoothGroup"] = booth.astype("category")
+
+    # Candidate columns = numeric columns excluding any "TOTAL"/"TURNOVER" columns
+    exclude_keywords = ["TOTAL", "TURNOVER"]
+    candidate_cols = [c for c in numeric_cols if not any(k in c.upper() for k in exclude_keywords)]
+
+    return {
+        "data": df,
+        "candidates": candidate_cols,
+        "polling_col": polling_col,
+        "variant": variant,
+        "sep": sep,
+        "header_row": header_row,
+        "party_row": candidate_row if variant.endswith("party-row") else None,
+    }
+
+
+def load_clean_csv(file_path):
+    """
+    Robust loader (see parse_form20):
+    - auto-detects separator
+    - finds header row (SL. NO & POLLING)
+    - builds column names
+    - ensures unique column names (avoids duplicate-label DataFrame access)
+    - converts numeric columns safely
+    - extracts BoothGroup reliably (falls back to index if missing)
+    Returns: df, candidate_columns_list, polling_col (or None)
+    """
+    parsed = parse_form20(file_path)
+    return parsed["data"], parsed["candidates"], parsed["polling_col"]
@@ -0,0 +1,157 @@
+# utils/ingest.py
+"""
+Offline bulk ingestion of the data/ tree.
+
+Walks data/<District>/<Constituency>/*.csv, parses every Form-20 file in a
+process pool and produces a validation report. The parsed frames land in the
+on-disk parse cache (see utils/parse_cache.py) that the pages load through,
+so the first visit to a constituency reads Parquet instead of parsing CSV.
+Run it once before deploying, from the repo root:
+
+    python -m utils.ingest                 # all of data/
+    python -m utils.ingest --workers 8 --report ingest_report.json
+
+Exit status is 1 if any file could not be parsed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.form20 import memory_report
+from utils.manifest import DATA_DIR, constituency_files, get_manifest
+from utils.parse_cache import DEFAULT_CACHE_DIR, parse_form20_cached
+
+
+def discover_constituencies(data_dir=DATA_DIR):
+    """{(district, constituency): [(year, filename), ...]} for every constituency in the manifest."""
+    manifest = get_manifest(data_dir)
+    pairs = manifest[["District", "Constituency"]].drop_duplicates().itertuples(index=False)
+    return {(d, c): constituency_files(d, c, data_dir) for d, c in pairs}
+
+
+def validate_parsed(parsed):
+    """Sanity checks for one parsed file (header was found if we got here)."""
+    df = parsed["data"]
+    candidate_cols = parsed["candidates"]
+    total_col = next((c for c in df.columns if "TOTAL" in c.upper() and "VOTE" in c.upper()), None)
+    report = {
+        "variant": parsed.get("variant"),
+        "header_row": parsed.get("header_row"),
+        "rows": int(len(df)),
+        "booths": int(df["BoothGroup"].nunique()),
+        "duplicate_rows": int(df.duplicated(subset=[parsed["polling_col"]] if parsed["polling_col"] else None).sum()),
+        "candidates": len(candidate_cols),
+        "total_col": total_col,
+        **memory_report(df),
+    }
+    if total_col is not None:
+        # compact unsigned vote columns: widen before subtracting
+        cand_sum = df[candidate_cols].astype("int64").sum(axis=1)
+        diff = (cand_sum - df[total_col].astype("int64"))
+        report["sum_mismatch_rows"] = int((diff != 0).sum())
+        report["sum_mismatch_votes"] = int(diff.abs().sum())
+    return report
+
+
+def ingest_constituency(data_dir, district, constituency, files, cache_dir):
+    """Parse (and cache) one constituency's files. Runs in a worker."""
+    started = time.perf_counter()
+    folder = os.path.join(data_dir, district, constituency)
+    file_reports = {}
+    for year, filename in files:
+        path = os.path.join(folder, filename)
+        try:
+            parsed = parse_form20_cached(path, cache_dir)
+        except Exception as e:
+            file_reports[filename] = {"year": year, "ok": False, "error": str(e)}
+            continue
+        file_reports[filename] = {"year": year, "ok": True, **validate_parsed(parsed)}
+
+    return {
+        "district": district,
+        "constituency": constituency,
+        "booths_per_year": {r["year"]: r["booths"] for r in file_reports.values() if r["ok"]},
+        "files": file_reports,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def run(data_dir=DATA_DIR, cache_dir=DEFAULT_CACHE_DIR, workers=None, progress=None):
+    """Ingest every constituency under data_dir. Returns the full report dict."""
+    started = time.perf_counter()
+    targets = discover_constituencies(data_dir)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(ingest_constituency, data_dir, d, c, files, cache_dir): (d, c)
+            for (d, c), files in targets.items()
+        }
+        for fut in as_completed(futures):
+            d, c = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                res = {"district": d, "constituency": c, "error": str(e), "files": {}}
+            results.append(res)
+            if progress:
+                progress(len(results), len(futures), res)
+
+    results.sort(key=lambda r: (r["district"], r["constituency"]))
+    unparsed = [
+        {"district": r["district"], "constituency": r["constituency"], "file": f, "error": info["error"]}
+        for r in results for f, info in r["files"].items() if not info["ok"]
+    ] + [
+        {"district": r["district"], "constituency": r["constituency"], "file": None, "error": r["error"]}
+        for r in results if "error" in r
+    ]
+    n_files = sum(len(r["files"]) for r in results)
+    return {
+        "data_dir": data_dir,
+        "cache_dir": cache_dir,
+        "constituencies": len(results),
+        "files": n_files,
+        "unparsed": unparsed,
+        "seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+
+
+def _print_summary(report):
+    print(f"Ingested {report['files']} files from {report['constituencies']} constituencies "
+          f"in {report['seconds']:.1f}s")
+    for r in report["results"]:
+        booths = ", ".join(f"{y}: {n}" for y, n in sorted(r.get("booths_per_year", {}).items()))
+        print(f"  {r['district']} / {r['constituency']}: {booths or 'no data'}")
+        for name, info in r["files"].items():
+            if info["ok"] and info.get("sum_mismatch_rows"):
+                print(f"    ⚠️ {name}: {info['sum_mismatch_rows']} rows where candidate votes ≠ {info['total_col']}")
+            if info["ok"] and info.get("duplicate_rows"):
+                print(f"    ⚠️ {name}: {info['duplicate_rows']} duplicate polling-station rows")
+    for u in report["unparsed"]:
+        print(f"  ❌ {u['district']}/{u['constituency']}/{u['file']}: {u['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-build parsed Form-20 data for every constituency.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="parse cache (cleaned frames)")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--report", default=None, help="write the validation report as JSON here")
+    args = parser.parse_args(argv)
+
+    def progress(done, total, res):
+        print(f"[{done}/{total}] {res['district']} / {res['constituency']}", file=sys.stderr)
+
+    report = run(os.path.abspath(args.data_dir), args.cache_dir, args.workers, progress)
+    _print_summary(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    return 1 if report["unparsed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
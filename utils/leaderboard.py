@@ -0,0 +1,142 @@
+# utils/leaderboard.py
+"""
+Constituency-wide booth leaderboard.
+
+Computes the per-booth "Historical Summary" (dominant alliance, average share,
+swing volatility, polarization index, strength class) for every booth at once
+from the booth × year table, using a booths × years × alliances share cube.
+Numbers match the single-booth summary on the Booth Analysis page.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.alliances import MAIN_ALLIANCES
+from utils.booth_table import table_alliances
+
+# (minimum average share of the dominant alliance, label), strongest first
+STRENGTH_LEVELS = [
+    (65, "💪 Very Strong Booth"),
+    (55, "🟢 Strong Booth"),
+    (45, "🟠 Competitive Booth"),
+]
+WEAK_LABEL = "🔴 Weak Booth"
+
+
+def strength_label(avg_share):
+    for threshold, label in STRENGTH_LEVELS:
+        if avg_share >= threshold:
+            return label
+    return WEAK_LABEL
+
+
+def _strength_labels(avg_shares):
+    avg_shares = np.asarray(avg_shares, dtype=float)
+    out = np.full(avg_shares.shape, WEAK_LABEL, dtype=object)
+    for threshold, label in reversed(STRENGTH_LEVELS):
+        out[avg_shares >= threshold] = label
+    return out
+
+
+def share_cube(booth_table, years):
+    """
+    Vote-share cube for the multi-year view.
+    Returns (booths, trend_alliances, shares, valid):
+      shares – float array [booth, year, alliance] in %, NaN where the booth
+               has no votes that year
+      valid  – bool array [booth, year]
+    Alliances outside MAIN_ALLIANCES are folded into OTHERS.
+    """
+    alliances = table_alliances(booth_table)
+    majors = [a for a in MAIN_ALLIANCES if a in alliances]
+    minors = [a for a in alliances if a not in MAIN_ALLIANCES]
+    trend_alliances = majors + ["OTHERS"]
+
+    booths = booth_table.index.get_level_values("BoothGroup").unique()
+    full_index = pd.MultiIndex.from_product([booths, list(years)], names=["BoothGroup", "year"])
+    t = booth_table.reindex(full_index)
+
+    total = t["total_votes"].to_numpy(dtype=float)
+    votes = np.column_stack(
+        [t[a].to_numpy(dtype=float) for a in majors] + [t[minors].to_numpy(dtype=float).sum(axis=1)]
+    )
+    valid = np.nan_to_num(total) > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(valid[:, None], votes / total[:, None] * 100, np.nan)
+
+    n_b, n_y, n_a = len(booths), len(years), len(trend_alliances)
+    return booths, trend_alliances, shares.reshape(n_b, n_y, n_a), valid.reshape(n_b, n_y)
+
+
+def build_leaderboard(booth_table, years, crosswalk=None):
+    """
+    One row per booth: years with data, dominant alliance, average share,
+    volatility, polarization, strength, plus the latest year's winner/margin.
+    With a crosswalk (utils/crosswalk.py; pass its aligned table), "Match" is
+    the lowest cross-year match confidence of the booth.
+    """
+    booths, alliances, shares, valid = share_cube(booth_table, years)
+    n_b, n_y, n_a = shares.shape
+    if n_b == 0:
+        return pd.DataFrame(columns=[
+            "Booth", "Years", "Dominant Alliance", "Avg Share %", "Volatility %",
+            "Polarization %", "Strength", "Latest Year", "Latest Winner", "Latest Margin %", "Match",
+        ])
+
+    # alliances shown for a booth: any vote share in any year, OTHERS always
+    present = np.nan_to_num(shares).sum(axis=1) > 0
+    present[:, alliances.index("OTHERS")] = True
+
+    filled = np.nan_to_num(shares)
+    n_valid = valid.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = filled.sum(axis=1) / n_valid[:, None]
+    avg_masked = np.where(present, avg, -np.inf)
+    dom = np.argmax(avg_masked, axis=1)
+    dom_share = avg[np.arange(n_b), dom]
+
+    # swing: differences between consecutive *valid* years, per alliance
+    prev = np.full((n_b, n_a), np.nan)
+    diff_sum = np.zeros((n_b, n_a))
+    diff_n = np.zeros(n_b)
+    for y in range(n_y):
+        cur = shares[:, y, :]
+        has_prev = valid[:, y] & ~np.isnan(prev[:, 0])
+        diff_sum += np.where(has_prev[:, None], np.abs(cur - np.nan_to_num(prev)), 0)
+        diff_n += has_prev
+        prev = np.where(valid[:, y][:, None], cur, prev)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_alliance = diff_sum / diff_n[:, None]
+        volatility = np.where(present, per_alliance, 0).sum(axis=1) / present.sum(axis=1)
+    volatility = np.where(diff_n > 0, volatility, np.nan)
+
+    # polarization: top-two gap in the most recent year with data
+    last_idx = n_y - 1 - np.argmax(valid[:, ::-1], axis=1)
+    last = np.where(present, shares[np.arange(n_b), last_idx, :], -np.inf)
+    top2 = -np.sort(-last, axis=1)[:, :2] if n_a > 1 else np.column_stack([last[:, 0], np.zeros(n_b)])
+    polarization = top2[:, 0] - np.where(np.isfinite(top2[:, 1]), top2[:, 1], 0)
+
+    years_arr = np.array([str(y) for y in years], dtype=object)
+    last_year = years_arr[last_idx]
+    latest = booth_table.reindex(pd.MultiIndex.from_arrays([booths, last_year]))
+
+    board = pd.DataFrame({
+        "Booth": booths.astype(str),
+        "Years": n_valid,
+        "Dominant Alliance": np.array(alliances, dtype=object)[dom],
+        "Avg Share %": dom_share.round(1),
+        "Volatility %": volatility.round(2),
+        "Polarization %": polarization.round(1),
+        "Strength": _strength_labels(dom_share),
+        "Latest Year": last_year,
+        "Latest Winner": latest["winner"].to_numpy(),
+        "Latest Margin %": latest["margin_pct"].to_numpy(),
+        "Match": crosswalk.min_confidence(booths) if crosswalk is not None else np.nan,
+    })
+    board = board[board["Years"] > 0]
+    return sort_booths(board).reset_index(drop=True)
+
+
+def sort_booths(df, col="Booth"):
+    """Order rows by booth number numerically ("2" before "10"), then by label."""
+    key = pd.to_numeric(df[col].str.extract(r"(\d+)", expand=False), errors="coerce")
+    return df.assign(_key=key).sort_values(["_key", col], kind="stable").drop(columns="_key")
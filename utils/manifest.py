@@ -0,0 +1,122 @@
+# utils/manifest.py
+"""
+Constituency manifest discovered from the data/ tree.
+
+Files live at data/<District>/<Constituency>/<YEAR>AC<NO><MP|MLA>.csv, e.g.
+data/Ariyalur/Jayankondam/2021AC150MLA.csv. The index is cached per data
+directory and rebuilt when any directory mtime in the tree changes (adding,
+removing or renaming a file or folder bumps its parent's mtime).
+"""
+import os
+import re
+import threading
+
+import pandas as pd
+
+from utils.perf import PERF
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+MANIFEST_COLUMNS = ["District", "Constituency", "AC No", "Year", "Election", "File"]
+
+# 2021AC150MLA.csv → year 2021, AC 150, MLA (assembly) / MP (Lok Sabha)
+FILENAME_RE = re.compile(r"^(?P<year>\d{4})AC(?P<ac>\d+)(?P<kind>MLA|MP)\.csv$", re.IGNORECASE)
+# anything else that still starts with a year is accepted with unknown AC / type
+_YEAR_PREFIX = re.compile(r"^(?P<year>\d{4})")
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def parse_filename(name):
+    """(year, ac_no or None, "MLA"/"MP"/None) for a Form-20 file name, or None if it isn't one."""
+    if not name.lower().endswith(".csv"):
+        return None
+    m = FILENAME_RE.match(name)
+    if m:
+        return m.group("year"), int(m.group("ac")), m.group("kind").upper()
+    m = _YEAR_PREFIX.match(name)
+    if m:
+        return m.group("year"), None, None
+    return None
+
+
+def _tree_signature(data_dir):
+    """mtimes of the data dir and every district / constituency folder."""
+    sig = [("", "", os.stat(data_dir).st_mtime_ns)]
+    for district in os.scandir(data_dir):
+        if not district.is_dir():
+            continue
+        sig.append((district.name, "", district.stat().st_mtime_ns))
+        for constituency in os.scandir(district.path):
+            if constituency.is_dir():
+                sig.append((district.name, constituency.name, constituency.stat().st_mtime_ns))
+    return tuple(sorted(sig))
+
+
+def scan(data_dir=DATA_DIR):
+    """Walk data_dir and return the manifest as a DataFrame (uncached)."""
+    rows = []
+    for district in sorted(os.listdir(data_dir)):
+        d_path = os.path.join(data_dir, district)
+        if not os.path.isdir(d_path):
+            continue
+        for constituency in sorted(os.listdir(d_path)):
+            c_path = os.path.join(d_path, constituency)
+            if not os.path.isdir(c_path):
+                continue
+            for name in sorted(os.listdir(c_path)):
+                parsed = parse_filename(name)
+                if parsed is None:
+                    continue
+                year, ac_no, kind = parsed
+                rows.append([district, constituency, ac_no, year, kind, name])
+    return pd.DataFrame(rows, columns=MANIFEST_COLUMNS)
+
+
+def get_manifest(data_dir=DATA_DIR):
+    """Cached manifest for data_dir; rescanned only when the tree's mtimes change."""
+    data_dir = os.path.abspath(data_dir)
+    with PERF.timer("manifest_lookup"):
+        sig = _tree_signature(data_dir)
+    with _lock:
+        hit = _cache.get(data_dir)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+    with PERF.timer("manifest_scan"):
+        manifest = scan(data_dir)
+    with _lock:
+        _cache[data_dir] = (sig, manifest)
+    return manifest
+
+
+def districts(data_dir=DATA_DIR):
+    return sorted(get_manifest(data_dir)["District"].unique())
+
+
+def constituencies(district, data_dir=DATA_DIR):
+    m = get_manifest(data_dir)
+    return sorted(m.loc[m["District"] == district, "Constituency"].unique())
+
+
+def constituency_files(district, constituency, data_dir=DATA_DIR):
+    """
+    [(year, filename), ...] oldest first. If a year has more than one file
+    (say both an MP and an MLA sheet), the first by name wins.
+    """
+    m = get_manifest(data_dir)
+    rows = m[(m["District"] == district) & (m["Constituency"] == constituency)]
+    files = {}
+    for year, name in zip(rows["Year"], rows["File"]):
+        files.setdefault(year, name)
+    return sorted(files.items(), key=lambda x: int(x[0]))
+
+
+def constituency_folder(district, constituency, data_dir=DATA_DIR):
+    return os.path.join(os.path.abspath(data_dir), district, constituency)
+
+
+def invalidate_manifest(data_dir=DATA_DIR):
+    """Forget the cached manifest so the next lookup rescans data_dir."""
+    with _lock:
+        _cache.pop(os.path.abspath(data_dir), None)
@@ -0,0 +1,149 @@
+# utils/parse_cache.py
+"""
+On-disk cache of cleaned Form-20 frames.
+
+Parsing a Form-20 CSV (sniffing, tokenising, numeric conversion) is far
+slower than reading a columnar file. The cleaned DataFrame is stored as
+Parquet next to a small JSON sidecar holding candidate_cols, polling_col and
+the detected variant, keyed on the CSV's absolute path, mtime, size and
+PARSER_VERSION. A changed CSV gets a new key, so it is re-parsed
+automatically on the next load.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+from utils.form20 import PARSER_VERSION, parse_form20
+from utils.perf import PERF
+
+DEFAULT_CACHE_DIR = os.path.abspath(
+    os.environ.get(
+        "BOOTH_CACHE_DIR",
+        os.path.join(os.path.dirname(__file__), "..", ".cache", "form20"),
+    )
+)
+
+
+def _sha1(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(file_path):
+    """
+    Key for a CSV: "<path hash>_<state hash>". The state part changes with the
+    file's mtime, size or the parser version; the path part lets stale entries
+    for the same file be found and removed.
+    """
+    file_path = os.path.abspath(file_path)
+    st = os.stat(file_path)
+    state = f"{st.st_mtime_ns}|{st.st_size}|v{PARSER_VERSION}"
+    return f"{_sha1(file_path)[:16]}_{_sha1(state)[:16]}"
+
+
+def _entry_paths(file_path, cache_dir):
+    key = cache_key(file_path)
+    return (
+        os.path.join(cache_dir, f"{key}.parquet"),
+        os.path.join(cache_dir, f"{key}.json"),
+    )
+
+
+# parse_form20 fields kept in the JSON sidecar (everything except the frame)
+META_FIELDS = ["candidates", "polling_col", "variant", "sep", "header_row", "party_row"]
+
+
+def read_cached(file_path, cache_dir=DEFAULT_CACHE_DIR):
+    """Return a parse_form20-style dict from the cache, or None on a miss."""
+    data_path, meta_path = _entry_paths(file_path, cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        df = pd.read_parquet(data_path)
+    except Exception:
+        # corrupt / partially written entry or no parquet engine: treat as a miss
+        return None
+    parsed = {k: meta.get(k) for k in META_FIELDS}
+    parsed["data"] = df
+    return parsed
+
+
+def write_cached(file_path, parsed, cache_dir=DEFAULT_CACHE_DIR):
+    """Store a parse_form20 result. Failures are swallowed – the cache is best effort."""
+    data_path, meta_path = _entry_paths(file_path, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # write to temp names then rename, so readers never see half an entry
+        parsed["data"].to_parquet(data_path + ".tmp", index=False)
+        meta = {k: parsed.get(k) for k in META_FIELDS}
+        meta.update(source=os.path.abspath(file_path), parser_version=PARSER_VERSION)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(meta_path + ".tmp", meta_path)
+        _prune_stale(data_path, cache_dir)
+    except Exception:
+        for p in (data_path + ".tmp", meta_path + ".tmp"):
+            if os.path.exists(p):
+                os.remove(p)
+
+
+def _prune_stale(current_data_path, cache_dir):
+    """Remove older entries for the same source file (same path-hash prefix)."""
+    current = os.path.basename(current_data_path).rsplit(".", 1)[0]
+    prefix = current.split("_", 1)[0] + "_"
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and not name.startswith(current):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def invalidate_file(file_path, cache_dir=DEFAULT_CACHE_DIR):
+    """Remove every cached entry for file_path (any mtime/version). Returns the number of files removed."""
+    prefix = _sha1(os.path.abspath(file_path))[:16] + "_"
+    removed = 0
+    if not os.path.isdir(cache_dir):
+        return 0
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+# process-wide hit / miss counts (see utils/perf.py)
+PARSE_CACHE_STATS = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def parse_form20_cached(file_path, cache_dir=DEFAULT_CACHE_DIR):
+    """parse_form20 backed by the on-disk cache (same dict, including "variant")."""
+    name = os.path.basename(file_path)
+    with PERF.timer("parse_cache_read", file=name):
+        hit = read_cached(file_path, cache_dir)
+    with _stats_lock:
+        PARSE_CACHE_STATS["hits" if hit is not None else "misses"] += 1
+    if hit is not None:
+        return hit
+    with PERF.timer("parse_file", file=name):
+        parsed = parse_form20(file_path)
+    write_cached(file_path, parsed, cache_dir)
+    return parsed
+
+
+def load_clean_csv_cached(file_path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Drop-in replacement for load_clean_csv backed by the on-disk cache.
+    Returns: df, candidate_columns_list, polling_col (or None)
+    """
+    parsed = parse_form20_cached(file_path, cache_dir)
+    return parsed["data"], parsed["candidates"], parsed["polling_col"]
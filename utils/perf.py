@@ -0,0 +1,127 @@
+# utils/perf.py
+"""
+In-process stage timings.
+
+Code wraps a stage in PERF.timer("stage") (or @timed("stage")); durations go
+into a rolling window per stage (the last BOOTH_PERF_WINDOW samples, default
+2000) for p50 / p95 / p99, and every sample is also kept as a structured event
+for export. Like the dataset cache, the store lives for the whole server
+process and is shared by all sessions.
+
+    with PERF.timer("parse_file", file="2021AC150MLA.csv"):
+        ...
+    PERF.summary()        # DataFrame: stage, count, mean/p50/p95/p99/max ms
+    PERF.to_jsonl()       # one JSON object per event
+
+Set BOOTH_PERF_LOG to a file path to also append every event there as a JSON
+line as it happens.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WINDOW = int(os.environ.get("BOOTH_PERF_WINDOW", "2000"))
+LOG_PATH = os.environ.get("BOOTH_PERF_LOG") or None
+
+SUMMARY_COLUMNS = ["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+
+
+class PerfStore:
+    def __init__(self, window=DEFAULT_WINDOW, log_path=LOG_PATH):
+        self.window = window
+        self.log_path = log_path
+        self._samples = {}                    # stage -> deque of ms
+        self._counts = {}                     # stage -> total samples ever
+        self._events = deque(maxlen=window * 4)
+        self._lock = threading.Lock()
+
+    def record(self, stage, ms, **fields):
+        event = {"ts": round(time.time(), 3), "stage": stage, "ms": round(ms, 3), **fields}
+        with self._lock:
+            self._samples.setdefault(stage, deque(maxlen=self.window)).append(ms)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+            self._events.append(event)
+        if self.log_path:
+            try:
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(event, default=str) + "\n")
+            except OSError:
+                pass
+
+    @contextmanager
+    def timer(self, stage, **fields):
+        started = time.perf_counter()
+        try:
+            yield fields  # callers may add fields (e.g. cached=True) before the block ends
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000, **fields)
+
+    def summary(self):
+        """Percentiles over the rolling window, one row per stage."""
+        with self._lock:
+            samples = {s: np.fromiter(d, dtype=float) for s, d in self._samples.items()}
+            counts = dict(self._counts)
+        rows = []
+        for stage in sorted(samples):
+            ms = samples[stage]
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            rows.append([stage, counts[stage], ms.mean(), p50, p95, p99, ms.max()])
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS).round(3)
+
+    def events(self, stage=None):
+        with self._lock:
+            return [e for e in self._events if stage is None or e["stage"] == stage]
+
+    def to_jsonl(self):
+        return "".join(json.dumps(e, default=str) + "\n" for e in self.events())
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._events.clear()
+
+
+# The shared instance used across the app.
+PERF = PerfStore()
+
+
+def timed(stage, store=None):
+    """Decorator form of PERF.timer."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with (store or PERF).timer(stage):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def hit_rate(hits, misses):
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": (hits / lookups) if lookups else 0.0}
+
+
+def cache_stats():
+    """Hit rates of the app's caches: {name: {"hits", "misses", "hit_rate"}}."""
+    # imported here: the cache modules themselves record into PERF
+    from utils.analytics import report_memo_stats
+    from utils.dataset_cache import DATASET_CACHE
+    from utils.figures import FIGURE_CACHE
+    from utils.parse_cache import PARSE_CACHE_STATS
+
+    dataset = DATASET_CACHE.stats()
+    figures = FIGURE_CACHE.stats()
+    return {
+        "parse cache (disk)": hit_rate(PARSE_CACHE_STATS["hits"], PARSE_CACHE_STATS["misses"]),
+        "dataset cache": hit_rate(dataset["hits"], dataset["misses"]),
+        "booth report memo": report_memo_stats(),
+        "figure cache": hit_rate(figures["hits"], figures["misses"]),
+    }
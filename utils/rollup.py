@@ -0,0 +1,99 @@
+# utils/rollup.py
+"""
+District rollup: alliance shares, swing and booth-strength counts aggregated
+across every constituency of a district.
+
+Constituencies are loaded and analysed concurrently in a thread pool (through
+the shared dataset cache) and merged as they finish, so callers can show
+partial results while slower constituencies are still parsing.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import pandas as pd
+
+from utils.analytics import analyze_constituency
+from utils.booth_table import alliance_order
+from utils.leaderboard import STRENGTH_LEVELS, WEAK_LABEL
+from utils.manifest import DATA_DIR, constituencies
+
+STRENGTH_ORDER = [label for _, label in STRENGTH_LEVELS] + [WEAK_LABEL]
+DEFAULT_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class DistrictRollup:
+    district: str
+    constituencies: list          # names merged so far
+    alliance_votes: pd.DataFrame  # year × alliance, summed over constituencies
+    alliance_share: pd.DataFrame  # year × alliance (%)
+    swing: pd.DataFrame           # change in share (points) vs the previous election
+    strength_counts: pd.DataFrame # constituency × strength label (booth counts)
+    summary: pd.DataFrame         # one row per constituency
+
+
+def merge_reports(district, reports):
+    """Combine ConstituencyReports into a DistrictRollup."""
+    reports = sorted(reports, key=lambda r: r.constituency)
+    if reports:
+        votes = pd.concat([r.alliance_votes for r in reports]).fillna(0).groupby(level=0).sum()
+        votes = votes.loc[sorted(votes.index, key=int), alliance_order(votes.columns)].astype("int64")
+    else:
+        votes = pd.DataFrame()
+    share = votes.div(votes.sum(axis=1), axis=0).fillna(0) * 100 if len(votes) else votes
+    swing = share.diff().dropna(how="all") if len(share) else share
+
+    strength = pd.DataFrame(
+        [r.leaderboard["Strength"].value_counts().reindex(STRENGTH_ORDER, fill_value=0) for r in reports],
+        index=[r.constituency for r in reports],
+        columns=STRENGTH_ORDER,
+    ).fillna(0).astype("int64")
+
+    rows = []
+    for r in reports:
+        latest = r.alliance_share.iloc[-1] if len(r.alliance_share) else pd.Series(dtype=float)
+        rows.append({
+            "Constituency": r.constituency,
+            "Booths": r.booth_count,
+            "Years": ", ".join(r.years),
+            "Latest Leader": latest.idxmax() if len(latest) else None,
+            "Latest Leader %": round(float(latest.max()), 1) if len(latest) else None,
+        })
+    return DistrictRollup(
+        district=district,
+        constituencies=[r.constituency for r in reports],
+        alliance_votes=votes,
+        alliance_share=share,
+        swing=swing,
+        strength_counts=strength,
+        summary=pd.DataFrame(rows, columns=["Constituency", "Booths", "Years", "Latest Leader", "Latest Leader %"]),
+    )
+
+
+def iter_district_rollup(district, names=None, data_dir=DATA_DIR, workers=DEFAULT_WORKERS):
+    """
+    Analyse constituencies concurrently and yield (done, total, rollup_so_far,
+    error) after each one finishes. error is (constituency, message) or None.
+    names defaults to every constituency of the district in the manifest.
+    """
+    names = constituencies(district, data_dir) if names is None else list(names)
+    reports = []
+    if not names:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names)))) as pool:
+        futures = {pool.submit(analyze_constituency, district, c, data_dir): c for c in names}
+        for done, fut in enumerate(as_completed(futures), start=1):
+            error = None
+            try:
+                reports.append(fut.result())
+            except Exception as e:
+                error = (futures[fut], str(e))
+            yield done, len(names), merge_reports(district, reports), error
+
+
+def district_rollup(district, names=None, data_dir=DATA_DIR, workers=DEFAULT_WORKERS):
+    """Blocking variant: the final DistrictRollup (errors are skipped)."""
+    rollup = merge_reports(district, [])
+    for _, _, rollup, _ in iter_district_rollup(district, names, data_dir, workers):
+        pass
+    return rollup
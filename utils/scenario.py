@@ -0,0 +1,185 @@
+# utils/scenario.py
+"""
+What-if alliance scenarios.
+
+A scenario re-assigns parties to alliances for any election year and moves a
+fraction of a party's votes to another alliance ("NTK splits 50/50"). Booth
+results are recomputed from per-booth party votes with one matrix product per
+year:
+
+    alliance_votes = party_votes (booths × parties) @ W (parties × alliances)
+
+where row p of W is the one-hot alliance of party p minus its outgoing
+transfers plus the transfer fractions. Party votes are folded once per
+dataset and memoised, so a scenario update is a matmul plus the usual
+winner / margin / leaderboard pass – quick enough to follow a slider.
+
+    s = Scenario(alliances={"2024": {...}}, transfers=(("2024", "NTK", "DMK+ALLIANCE", 0.5),))
+    result = simulate(dataset, s)
+    result.table, result.leaderboard
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from utils.alliances import ALLIANCES_BY_YEAR, AllianceLookup, party_of
+from utils.booth_table import SUMMARY_COLS, _year_table, add_summary, alliance_order
+from utils.leaderboard import build_leaderboard, sort_booths
+
+
+@dataclass(frozen=True)
+class PartyVotes:
+    """One election's booth × party vote matrix."""
+    year: str
+    booths: pd.Index
+    parties: list
+    votes: np.ndarray     # int64 [booth, party]
+    polled: np.ndarray    # int64 [booth]
+    voters: np.ndarray    # int64 [booth]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    # {year: {alliance: [party, ...]}}; years not given keep ALLIANCES_BY_YEAR
+    alliances: dict = field(default_factory=dict)
+    # (year, party, to_alliance, fraction of the party's votes)
+    transfers: tuple = ()
+
+    def alliances_for(self, year):
+        year = str(year)
+        return self.alliances.get(year, ALLIANCES_BY_YEAR.get(year, {}))
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    table: pd.DataFrame        # same layout as booth_table.build_booth_table
+    leaderboard: pd.DataFrame  # same layout as leaderboard.build_leaderboard
+
+
+def _party_votes(year, info):
+    parties = list(dict.fromkeys(party_of(c) for c in info["candidates"]))
+    # one "alliance" per party: _year_table then yields booth × party sums
+    lookup = AllianceLookup({p: [p] for p in parties if p != "NOTA"})
+    t = _year_table(year, info, {str(year): lookup})
+    return PartyVotes(
+        year=str(year),
+        booths=t.index,
+        parties=lookup.names,
+        votes=t[lookup.names].to_numpy(dtype=np.int64),
+        polled=t["polled_votes"].fillna(0).to_numpy(dtype=np.int64),
+        voters=t["total_voters"].fillna(0).to_numpy(dtype=np.int64),
+    )
+
+
+_MEMO_SIZE = 16
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def party_votes(dataset):
+    """{year: PartyVotes} for a loaded dataset, memoised on the dataset key."""
+    key = dataset.get("key")
+    with _memo_lock:
+        if key is not None and key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    out = {year: _party_votes(year, info) for year, info in dataset["all_data"].items()}
+    if key is not None:
+        with _memo_lock:
+            _memo[key] = out
+            while len(_memo) > _MEMO_SIZE:
+                _memo.popitem(last=False)
+    return out
+
+
+def weight_matrix(parties, alliances, transfers=()):
+    """
+    (alliance names, W) for one year. transfers: (party, to_alliance, fraction).
+    Raises ValueError for an unknown target alliance or a party giving away
+    more than all of its votes.
+    """
+    lookup = AllianceLookup(alliances)
+    names = lookup.names
+    w = np.zeros((len(parties), len(names)))
+    w[np.arange(len(parties)), [lookup.code_of(p) for p in parties]] = 1.0
+    pos = {p: i for i, p in enumerate(parties)}
+    for party, target, fraction in transfers:
+        if target not in names:
+            raise ValueError(f"Unknown alliance for transfer: {target}")
+        i = pos.get(str(party).upper())
+        if i is None or not fraction:
+            continue
+        w[i, lookup.code_of(party)] -= fraction
+        w[i, names.index(target)] += fraction
+    if (w < -1e-9).any():
+        raise ValueError("Vote transfers take more than 100% of a party's votes")
+    return names, w
+
+
+def largest_remainder(values, totals):
+    """
+    Round a float matrix to integers row by row (Hamilton / largest remainder):
+    floor every cell, then hand the votes still missing from each row's total
+    to the cells with the largest fractional parts (leftmost first on ties).
+    Each row then sums exactly to totals.
+    """
+    floor = np.floor(values)
+    short = (np.asarray(totals) - floor.sum(axis=1)).astype(np.int64)
+    order = np.argsort(-(values - floor), axis=1, kind="stable")
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(values.shape[1])[None, :], axis=1)
+    return (floor + (rank < short[:, None])).astype(np.int64)
+
+
+def simulate(dataset, scenario):
+    """ScenarioResult for every booth and year of a dataset."""
+    frames = []
+    for year, pv in sorted(party_votes(dataset).items(), key=lambda x: int(x[0])):
+        transfers = [(p, a, f) for y, p, a, f in scenario.transfers if str(y) == year]
+        names, w = weight_matrix(pv.parties, scenario.alliances_for(year), transfers)
+        # transfers leave each row of W summing to 1, so booth totals are unchanged
+        votes = largest_remainder(pv.votes @ w, pv.votes.sum(axis=1))
+        frame = pd.DataFrame(votes, index=pv.booths, columns=names)
+        frame["total_votes"] = votes.sum(axis=1)
+        frame["polled_votes"] = pv.polled
+        frame["total_voters"] = pv.voters
+        frame["year"] = year
+        frames.append(frame)
+    if not frames:
+        empty = pd.DataFrame(columns=SUMMARY_COLS, index=pd.MultiIndex.from_arrays([[], []], names=["BoothGroup", "year"]))
+        return ScenarioResult(table=empty, leaderboard=build_leaderboard(empty, []))
+
+    table = pd.concat(frames, sort=False)
+    table.index.name = "BoothGroup"
+    table = table.set_index("year", append=True)
+    alliances = alliance_order(c for c in table.columns if c not in SUMMARY_COLS)
+    table[alliances] = table[alliances].fillna(0).astype(np.int64)
+    table = add_summary(table, alliances).sort_index()
+    years = sorted(party_votes(dataset), key=int)
+    crosswalk = dataset.get("crosswalk")
+    if crosswalk is None:
+        return ScenarioResult(table=table, leaderboard=build_leaderboard(table, years))
+    return ScenarioResult(table=table, leaderboard=build_leaderboard(crosswalk.align(table), years, crosswalk))
+
+
+def compare(baseline, result, year):
+    """
+    Booth-by-booth comparison for one year of two booth tables: baseline and
+    scenario winner, scenario margin, and whether the booth flipped.
+    """
+    year = str(year)
+    base = baseline.xs(year, level="year")
+    new = result.table.xs(year, level="year").reindex(base.index)
+    out = pd.DataFrame({
+        "Booth": base.index.astype(str),
+        "Baseline Winner": base["winner"].to_numpy(),
+        "Scenario Winner": new["winner"].to_numpy(),
+        "Scenario Runner-up": new["runner_up"].to_numpy(),
+        "Margin Votes": new["margin_votes"].to_numpy(),
+        "Margin %": new["margin_pct"].to_numpy(),
+    })
+    out["Flipped"] = out["Baseline Winner"].fillna("").ne(out["Scenario Winner"].fillna("")).to_numpy()
+    return sort_booths(out).reset_index(drop=True)
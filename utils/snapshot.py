@@ -0,0 +1,391 @@
+# utils/snapshot.py
+"""
+Static, pre-rendered dashboard snapshot.
+
+Most visitors only read results, yet every view of the Booth Analysis page is
+a full script rerun with fresh figures. This build step renders every
+constituency once into plain files that any static web server (or a browser
+opening them from disk) can show without a Streamlit worker:
+
+  index.html                         district / constituency list
+  plotly.min.js                      bundled once, no CDN needed
+  <district>/<constituency>/
+      index.html                     booth picker + the Booth Analysis views
+                                     (summary boxes, yearly pies, multi-year
+                                     bars, historical summary), data inlined
+      data.json                      the same booth data for other consumers
+  snapshot.json                      per-constituency stamps of the last build
+
+Charts are drawn in the browser from compact per-booth data (alliance votes
+and shares), not from serialized figures, so a 300-booth constituency is a
+few hundred KB. Re-running the build only rewrites constituencies whose
+stamp changed: their Form-20 files, the alliance config (the same key the
+figure cache uses) or the parser version.
+
+Password-protected constituencies (data/passwords.json) are skipped unless
+include_protected is set; serve such a bundle only behind access control.
+
+    python -m utils.snapshot build --out site/
+    python -m utils.snapshot build --include-protected --district Ariyalur
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import sys
+import time
+
+from utils.alliances import alliance_colors
+from utils.analytics import booth_report, load_dataset
+from utils.dataset_cache import _file_signature
+from utils.figures import alliance_config_key
+from utils.form20 import PARSER_VERSION
+from utils.manifest import DATA_DIR, constituencies, constituency_files, constituency_folder, districts
+from utils.parse_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_SNAPSHOT_DIR = os.path.abspath(
+    os.environ.get("BOOTH_SNAPSHOT_DIR", os.path.join(os.path.dirname(DEFAULT_CACHE_DIR), "snapshot"))
+)
+STAMP_FILE = "snapshot.json"
+# bump when the page template or the payload changes shape
+SNAPSHOT_VERSION = 1
+
+
+def _passwords(data_dir):
+    try:
+        with open(os.path.join(data_dir, "passwords.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def booth_payload(report, label):
+    """JSON-ready view of one BoothReport (see utils/analytics.py)."""
+    trend = report.trend
+    return {
+        "label": label,
+        "years": [
+            {
+                "year": r.year,
+                "votes": [[a, v] for a, v in r.alliance_votes.items()],
+                "winner": r.winner,
+                "margin_votes": r.margin_votes,
+                "margin_pct": r.margin_pct,
+                "polled": r.polled_votes,
+                "turnout": r.turnout_pct,
+            }
+            for r in report.years
+        ],
+        "missing": [list(m) for m in report.missing],
+        "trend": {
+            "years": [str(y) for y in trend.index],
+            "series": {a: [round(float(v), 2) for v in trend[a]] for a in trend.columns},
+        },
+        "summary": None if report.summary is None else {
+            "dominant": report.summary.dominant,
+            "avg_share": round(report.summary.avg_share, 2),
+            "volatility": round(report.summary.volatility, 2),
+            "polarization": round(report.summary.polarization, 2),
+            "strength": report.summary.strength,
+        },
+        "matches": [list(m) for m in report.matches],
+    }
+
+
+def constituency_payload(dataset, district, constituency):
+    index = dataset["booth_index"]
+    booths = index.booths
+    return {
+        "district": district,
+        "constituency": constituency,
+        "years": list(dataset["years"]),
+        "generated": time.strftime("%Y-%m-%d %H:%M"),
+        "colors": alliance_colors,
+        "booths": [[b, index.display(b)] for b in booths],
+        "reports": {b: booth_payload(booth_report(dataset, b), index.display(b)) for b in booths},
+    }
+
+
+def _inline_json(payload):
+    # "</" would end the <script> element early
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<title>Booth Analysis – {title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px auto; max-width: 1100px; padding: 0 16px; }}
+#picker {{ display: flex; gap: 8px; align-items: center; margin: 12px 0; }}
+#q {{ width: 260px; padding: 4px; }}
+#booth {{ min-width: 320px; padding: 4px; }}
+.box {{ text-align: center; font-size: 16px; border: 1px solid #ddd; border-radius: 8px;
+        background: #fafafa; padding: 10px; margin: 10px 0; }}
+.history {{ border: 1px solid #ddd; border-radius: 10px; padding: 15px; margin-top: 20px; background: #f9f9f9; }}
+.warn {{ background: #fff8e1; border-left: 4px solid #f0b400; padding: 8px 12px; margin: 8px 0; }}
+.info {{ background: #e8f1fb; border-left: 4px solid #3c7dd9; padding: 8px 12px; margin: 8px 0; }}
+.chart {{ height: 460px; }}
+</style>
+<script src="../../plotly.min.js"></script>
+</head><body>
+<p><a href="../../index.html">← all constituencies</a></p>
+<h1>🗳️ Booth Analysis – {district_html} District, {constituency_html} Constituency</h1>
+<p id="meta"></p>
+<div id="picker">
+  <input id="q" type="search" placeholder="Search booth number or polling station">
+  <select id="booth"></select>
+</div>
+<div id="out"></div>
+<script id="data" type="application/json">{data}</script>
+<script>
+const D = JSON.parse(document.getElementById("data").textContent);
+const out = document.getElementById("out"), sel = document.getElementById("booth"), q = document.getElementById("q");
+const span = D.years.length ? D.years[0] + "–" + D.years[D.years.length - 1] : "";
+document.getElementById("meta").textContent =
+  D.booths.length + " booths · elections " + D.years.join(", ") + " · snapshot " + D.generated;
+const fmt = n => n.toLocaleString("en-IN");
+const color = a => D.colors[a] || "#cccccc";
+
+function el(tag, cls, html) {{
+  const e = document.createElement(tag);
+  if (cls) e.className = cls;
+  if (html !== undefined) e.innerHTML = html;
+  out.appendChild(e);
+  return e;
+}}
+function esc(s) {{
+  const d = document.createElement("div"); d.textContent = s == null ? "" : String(s); return d.innerHTML;
+}}
+
+function fillPicker() {{
+  const needle = q.value.trim().toLowerCase(), current = sel.value;
+  sel.innerHTML = "";
+  for (const [b, label] of D.booths) {{
+    if (needle && !b.startsWith(needle) && !label.toLowerCase().includes(needle)) continue;
+    const o = document.createElement("option"); o.value = b; o.textContent = label; sel.appendChild(o);
+  }}
+  if ([...sel.options].some(o => o.value === current)) sel.value = current;
+  render(sel.value);
+}}
+
+function render(booth) {{
+  out.innerHTML = "";
+  const r = D.reports[booth];
+  if (!r) {{ if (q.value) el("div", "info", "No booth matches “" + esc(q.value) + "”."); return; }}
+  location.hash = encodeURIComponent(booth);
+  if (r.matches.length)
+    el("div", "info", "Matched across elections: " + r.matches.map(
+      ([y, src, conf, basis]) => `${{y}} → booth ${{esc(src)}} (${{basis}}, ${{Math.round(conf * 100)}}%)`).join(" · "));
+  const results = Object.fromEntries(r.years.map(y => [y.year, y]));
+  const missing = Object.fromEntries(r.missing);
+  for (const year of [...Object.keys(results), ...Object.keys(missing)].sort((a, b) => a - b)) {{
+    if (missing[year] === "no_data") {{ el("div", "warn", `No data found for Booth ${{esc(booth)}} in ${{year}}`); continue; }}
+    if (missing[year] === "no_votes") {{ el("div", "warn", `No vote values found for Booth ${{esc(booth)}} in ${{year}}`); continue; }}
+    const y = results[year];
+    el("div", "box",
+      `🗳️ <b>${{year}} Election Summary</b><br>🏆 <b>Winning Alliance:</b> ${{esc(y.winner)}}<br>` +
+      `📊 <b>Margin:</b> ${{fmt(y.margin_votes)}} votes (${{y.margin_pct.toFixed(2)}}%)<br>` +
+      `🗳️ <b>Total Votes Polled:</b> ${{fmt(y.polled)}}<br>🎯 <b>Turnout:</b> ${{y.turnout.toFixed(1)}}%`);
+    const labels = y.votes.map(v => v[0]);
+    Plotly.newPlot(el("div", "chart"), [{{
+      type: "pie", labels: labels, values: y.votes.map(v => v[1]), hole: 0.35,
+      marker: {{ colors: labels.map(color), line: {{ color: "white", width: 2 }} }},
+      texttemplate: "%{{label}}<br>%{{percent:.1%}} (%{{value:,}} votes)", textposition: "outside",
+    }}], {{ title: {{ text: `<b>${{year}} Election – Booth ${{esc(booth)}}</b>`, x: 0.5 }} }}, {{ responsive: true }});
+  }}
+  if (!r.summary) return;
+  const t = r.trend;
+  Plotly.newPlot(el("div", "chart"), Object.entries(t.series).map(([a, ys]) => ({{
+    type: "bar", name: a, x: t.years, y: ys, marker: {{ color: color(a) }},
+    text: ys.map(v => v.toFixed(1) + "%"), textposition: "outside",
+  }})), {{
+    title: {{ text: `<b>📊 Multi-Year Comparison (${{span}}) – Booth ${{esc(booth)}}</b>`, x: 0.5 }},
+    barmode: "group", xaxis: {{ title: {{ text: "Election Year" }}, type: "category" }},
+    yaxis: {{ title: {{ text: "Vote Share (%)" }} }},
+  }}, {{ responsive: true }});
+  const s = r.summary;
+  el("div", "history",
+    `<h4>📍 Booth ${{esc(booth)}} – Historical Summary (${{span}})</h4>` +
+    `🏆 <b>Dominant Alliance:</b> ${{esc(s.dominant)}}<br>📊 <b>Average Vote Share:</b> ${{s.avg_share.toFixed(1)}}%<br>` +
+    `🔄 <b>Swing Volatility:</b> ${{s.volatility.toFixed(2)}}%<br>⚖️ <b>Polarization Index:</b> ${{s.polarization.toFixed(1)}}%<br>` +
+    esc(s.strength));
+}}
+
+q.addEventListener("input", fillPicker);
+sel.addEventListener("change", () => render(sel.value));
+const start = decodeURIComponent(location.hash.slice(1));
+fillPicker();
+if (D.reports[start]) {{ sel.value = start; render(start); }}
+</script>
+</body></html>
+"""
+
+_INDEX = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Tamil Nadu Booth Dashboard – snapshot</title>
+<style>body {{ font-family: sans-serif; margin: 24px auto; max-width: 900px; padding: 0 16px; }}</style>
+</head><body>
+<h1>🗳️ Tamil Nadu Booth Dashboard</h1>
+<p>Read-only snapshot · generated {generated}</p>
+{body}
+</body></html>
+"""
+
+
+def _write_plotly(out_dir):
+    """Copy plotly.js into the bundle once per plotly version."""
+    import plotly
+    from plotly.offline import get_plotlyjs
+
+    path = os.path.join(out_dir, "plotly.min.js")
+    stamp = path + ".version"
+    try:
+        with open(stamp) as f:
+            if f.read() == plotly.__version__ and os.path.exists(path):
+                return
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(get_plotlyjs())
+    with open(stamp, "w") as f:
+        f.write(plotly.__version__)
+
+
+def _write_index(out_dir, built):
+    parts = []
+    for district in sorted({d for d, _ in built}):
+        links = "".join(
+            f'<li><a href="{html.escape(d)}/{html.escape(c)}/index.html">{html.escape(c)}</a></li>'
+            for d, c in sorted(built) if d == district
+        )
+        parts.append(f"<h2>📍 {html.escape(district)}</h2><ul>{links}</ul>")
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_INDEX.format(generated=time.strftime("%Y-%m-%d %H:%M"),
+                              body="".join(parts) or "<p>No constituencies in this snapshot.</p>"))
+
+
+def _replace(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_constituency(dataset, district, constituency, out_dir):
+    """
+    Render one constituency's index.html and data.json; returns the folder.
+    Both are rendered before either is written, and each file is swapped in
+    whole, so a failed render leaves the previous bundle as it was.
+    """
+    payload = constituency_payload(dataset, district, constituency)
+    data = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    page = _PAGE.format(
+        title=html.escape(f"{constituency} ({district})"),
+        district_html=html.escape(district),
+        constituency_html=html.escape(constituency),
+        data=_inline_json(payload),
+    )
+    folder = os.path.join(out_dir, district, constituency)
+    os.makedirs(folder, exist_ok=True)
+    _replace(os.path.join(folder, "data.json"), data)
+    _replace(os.path.join(folder, "index.html"), page)
+    return folder
+
+
+def build(data_dir=DATA_DIR, out_dir=DEFAULT_SNAPSHOT_DIR, include_protected=False, force=False,
+          only_district=None, progress=None):
+    """
+    Render every (unprotected) constituency into out_dir, skipping those whose
+    stamp (source files, alliance config, parser version) is unchanged since
+    the last build. Returns a summary dict:
+    written, skipped, protected, removed, errors, seconds.
+    """
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    stamp_path = os.path.join(out_dir, STAMP_FILE)
+    try:
+        with open(stamp_path) as f:
+            stamps = json.load(f)
+    except (OSError, ValueError):
+        stamps = {}
+    if stamps.get("version") != SNAPSHOT_VERSION:
+        stamps = {"version": SNAPSHOT_VERSION, "constituencies": {}}
+    previous = stamps["constituencies"]
+
+    passwords = _passwords(data_dir)
+    config = {"alliances": alliance_config_key(), "parser": PARSER_VERSION}
+    summary = {"written": 0, "skipped": 0, "protected": 0, "removed": 0, "errors": []}
+    current = {}
+    for district in districts(data_dir):
+        for constituency in constituencies(district, data_dir):
+            key = f"{district}/{constituency}"
+            if only_district and district != only_district:
+                if key in previous:
+                    current[key] = previous[key]  # outside this run: keep as is
+                continue
+            if passwords.get(district, {}).get(constituency) and not include_protected:
+                summary["protected"] += 1
+                continue
+            folder = constituency_folder(district, constituency, data_dir)
+            # lists, not tuples: compared against the JSON stamp file
+            signature = {**config, "files": [[year, name, list(_file_signature(os.path.join(folder, name)) or [])]
+                                             for year, name in constituency_files(district, constituency, data_dir)]}
+            if not force and previous.get(key) == signature and \
+                    os.path.exists(os.path.join(out_dir, district, constituency, "index.html")):
+                current[key] = signature
+                summary["skipped"] += 1
+                continue
+            if progress:
+                progress(district, constituency)
+            try:
+                write_constituency(load_dataset(district, constituency, data_dir), district, constituency, out_dir)
+            except Exception as e:
+                summary["errors"].append(f"{key}: {e}")
+                if key in previous:
+                    current[key] = previous[key]  # keep publishing the last good bundle
+                continue
+            current[key] = signature
+            summary["written"] += 1
+
+    # constituencies gone from data/ (or now excluded) leave the bundle too
+    for key in set(previous) - set(current):
+        district, constituency = key.split("/", 1)
+        shutil.rmtree(os.path.join(out_dir, district, constituency), ignore_errors=True)
+        summary["removed"] += 1
+        try:
+            os.rmdir(os.path.join(out_dir, district))  # only succeeds once the district is empty
+        except OSError:
+            pass
+
+    _write_plotly(out_dir)
+    _write_index(out_dir, [tuple(k.split("/", 1)) for k in current])
+    with open(stamp_path, "w") as f:
+        json.dump({"version": SNAPSHOT_VERSION, "constituencies": current}, f, indent=1)
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a static, read-only snapshot of the booth dashboard.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="render changed constituencies into static HTML/JSON")
+    b.add_argument("--data-dir", default=DATA_DIR)
+    b.add_argument("--out", default=DEFAULT_SNAPSHOT_DIR)
+    b.add_argument("--district", default=None, help="only (re)build this district")
+    b.add_argument("--include-protected", action="store_true",
+                   help="also render password-protected constituencies (serve behind access control)")
+    b.add_argument("--force", action="store_true", help="re-render every constituency")
+    args = parser.parse_args(argv)
+
+    summary = build(os.path.abspath(args.data_dir), os.path.abspath(args.out), args.include_protected,
+                    args.force, args.district, progress=lambda d, c: print(f"{d} / {c}", file=sys.stderr))
+    print(f"Wrote {summary['written']} constituencies, skipped {summary['skipped']} unchanged, "
+          f"{summary['protected']} password-protected, removed {summary['removed']}, "
+          f"in {summary['seconds']:.1f}s → {os.path.abspath(args.out)}")
+    for err in summary["errors"]:
+        print(f"  ❌ {err}")
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
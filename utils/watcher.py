@@ -0,0 +1,187 @@
+# utils/watcher.py
+"""
+Background watcher for the data/ tree.
+
+A daemon thread polls the mtime and size of every Form-20 CSV under
+data/<District>/<Constituency>/ (stdlib only, no inotify). When a file is added,
+overwritten or removed it invalidates only what depends on that file:
+
+  parse cache     – the file's own Parquet entries
+  dataset cache   – the constituency's dataset (booth table, leaderboard)
+  report memo     – booth reports built from that dataset
+  figure cache    – chart specs built from that dataset
+  manifest        – rescanned when files appear or disappear
+
+and rebuilds whatever was warm before, so the next session to ask gets a hit.
+Everything else stays cached. A change is applied only once the file has
+looked the same on two consecutive polls, so a sheet that is still being
+copied in isn't parsed half-written.
+
+    start_watcher()           # idempotent; pages call it on every run
+    BOOTH_WATCH_INTERVAL=0    # disables the watcher
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from utils.analytics import invalidate_reports, load_dataset
+from utils.dataset_cache import DATASET_CACHE, invalidate_constituency
+from utils.figures import invalidate_figures
+from utils.manifest import DATA_DIR, constituency_folder, invalidate_manifest, parse_filename
+from utils.parse_cache import DEFAULT_CACHE_DIR, invalidate_file, parse_form20_cached
+
+DEFAULT_INTERVAL = float(os.environ.get("BOOTH_WATCH_INTERVAL", "5"))
+
+
+def snapshot(data_dir=DATA_DIR):
+    """{(district, constituency, filename): (mtime_ns, size)} for every Form-20 file."""
+    files = {}
+    try:
+        districts = list(os.scandir(data_dir))
+    except OSError:
+        return files
+    for district in districts:
+        if not district.is_dir():
+            continue
+        for constituency in os.scandir(district.path):
+            if not constituency.is_dir():
+                continue
+            for f in os.scandir(constituency.path):
+                if f.is_file() and parse_filename(f.name) is not None:
+                    try:
+                        st = f.stat()
+                    except OSError:
+                        continue
+                    files[(district.name, constituency.name, f.name)] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+class DataWatcher:
+    def __init__(self, data_dir=DATA_DIR, interval=DEFAULT_INTERVAL, cache=DATASET_CACHE,
+                 cache_dir=DEFAULT_CACHE_DIR):
+        self.data_dir = os.path.abspath(data_dir)
+        self.interval = interval
+        self.cache = cache
+        self.cache_dir = cache_dir
+        self._seen = snapshot(self.data_dir)   # state the caches reflect
+        self._pending = {}                     # file -> signature seen on the last poll
+        self._stop = threading.Event()
+        self._thread = None
+        self.scans = 0
+        self.last_scan = None
+        self.last_error = None
+        self.events = deque(maxlen=50)         # (time, kind, district/constituency/file)
+
+    # -- polling ---------------------------------------------------------
+    def poll(self):
+        """Scan once and apply settled changes. Returns [(kind, key), ...] applied."""
+        current = snapshot(self.data_dir)
+        settled = []
+        for key in set(current) | set(self._seen) | set(self._pending):
+            sig = current.get(key)
+            if sig == self._seen.get(key):
+                self._pending.pop(key, None)
+                continue
+            if key in self._pending and self._pending[key] == sig:
+                settled.append(key)
+            else:
+                self._pending[key] = sig
+
+        applied = []
+        for key in settled:
+            before, after = self._seen.get(key), self._pending.pop(key)
+            kind = "added" if before is None else "removed" if after is None else "changed"
+            if after is None:
+                self._seen.pop(key, None)
+            else:
+                self._seen[key] = after
+            applied.append((kind, key))
+        if applied:
+            self._apply(applied)
+        self.scans += 1
+        self.last_scan = time.time()
+        return applied
+
+    def _apply(self, changes):
+        if any(kind != "changed" for kind, _ in changes):
+            invalidate_manifest(self.data_dir)
+
+        by_folder = {}
+        for kind, (district, constituency, name) in changes:
+            by_folder.setdefault((district, constituency), []).append((kind, name))
+            self.events.append((time.time(), kind, f"{district}/{constituency}/{name}"))
+
+        for (district, constituency), files in by_folder.items():
+            folder = constituency_folder(district, constituency, self.data_dir)
+            reparse = []
+            for kind, name in files:
+                path = os.path.join(folder, name)
+                had_entry = invalidate_file(path, self.cache_dir) > 0
+                if kind == "changed" and had_entry:
+                    reparse.append(path)
+            was_loaded = invalidate_constituency(folder, self.cache) > 0
+            invalidate_reports(folder)
+            invalidate_figures(folder)
+
+            # rebuild only what was warm before the change
+            try:
+                if was_loaded:
+                    load_dataset(district, constituency, self.data_dir)
+                else:
+                    for path in reparse:
+                        parse_form20_cached(path, self.cache_dir)
+            except Exception as e:
+                self.last_error = f"{district}/{constituency}: {e}"
+
+    # -- thread ----------------------------------------------------------
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.last_error = str(e)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "files": len(self._seen),
+            "pending": len(self._pending),
+            "scans": self.scans,
+            "last_scan": self.last_scan,
+            "last_error": self.last_error,
+            "events": list(self.events),
+        }
+
+
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def start_watcher(data_dir=DATA_DIR, interval=DEFAULT_INTERVAL):
+    """The process-wide watcher for data_dir, started on first call. None if interval <= 0."""
+    if interval <= 0:
+        return None
+    data_dir = os.path.abspath(data_dir)
+    with _watchers_lock:
+        watcher = _watchers.get(data_dir)
+        if watcher is None:
+            watcher = _watchers[data_dir] = DataWatcher(data_dir, interval)
+        return watcher.start()